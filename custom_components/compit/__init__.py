@@ -2,41 +2,69 @@
 
 from __future__ import annotations
 
+import logging
+import time
 from typing import TYPE_CHECKING
 
 from compit_inext_api import CannotConnect, CompitApiConnector, InvalidAuth
-from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, Platform
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from homeassistant.core import callback
 from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers import config_validation as cv
 
+from .command_queue import async_remove_command_queue
+from .const import DOMAIN
 from .coordinator import CompitConfigEntry, CompitDataUpdateCoordinator
 from .device import setup_devices
+from .discovery import platforms_in_use
+from .profiling import DATA_PROFILER, CompitProfiler
+from .services import async_setup_services
+from .session import async_get_compit_session
+from .snapshot import async_remove_snapshot
+from .tracing import async_get_tracer, span
+from .websocket_api import async_setup_websocket_api
 
 if TYPE_CHECKING:
     from homeassistant.core import HomeAssistant
+    from homeassistant.helpers.typing import ConfigType
 
-PLATFORMS: tuple[Platform, ...] = (
-    Platform.CLIMATE,
-    Platform.NUMBER,
-    Platform.SELECT,
-    Platform.SENSOR,
-    Platform.SWITCH,
-)
+_LOGGER: logging.Logger = logging.getLogger(__name__)
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, _config: ConfigType) -> bool:
+    """Set up the Compit services and websocket commands."""
+    hass.data[DATA_PROFILER] = CompitProfiler(hass)
+    async_setup_services(hass)
+    async_setup_websocket_api(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: CompitConfigEntry) -> bool:
     """Set up Compit from a config entry."""
-
-    session = async_get_clientsession(hass)
+    setup_start = time.perf_counter()
+    session = async_get_compit_session(hass)
     connector = CompitApiConnector(session)
+    coordinator = CompitDataUpdateCoordinator(hass, entry, connector)
     try:
-        connected = await connector.init(
-            entry.data[CONF_EMAIL],
-            entry.data[CONF_PASSWORD],
-            hass.config.language,
-        )
+        with async_get_tracer(hass, entry).trace("setup"), span("login"):
+            connected = await connector.init(
+                entry.data[CONF_EMAIL],
+                entry.data[CONF_PASSWORD],
+                hass.config.language,
+            )
     except CannotConnect as e:
-        raise ConfigEntryNotReady(f"Error while connecting to Compit: {e}") from e
+        # Start from the saved devices and values, and log in again on every
+        # refresh, instead of leaving all entities unavailable.
+        if not await coordinator.async_restore_snapshot():
+            raise ConfigEntryNotReady(f"Error while connecting to Compit: {e}") from e
+        _LOGGER.warning(
+            "Cannot connect to Compit (%s), showing the values saved %.0f s ago",
+            e,
+            coordinator.snapshot.age,
+        )
+        connected = True
     except InvalidAuth as e:
         raise ConfigEntryAuthFailed(
             f"Invalid credentials for {entry.data[CONF_EMAIL]}",
@@ -45,21 +73,78 @@ async def async_setup_entry(hass: HomeAssistant, entry: CompitConfigEntry) -> bo
     if not connected:
         raise ConfigEntryAuthFailed("Authentication API error")
 
-    coordinator = CompitDataUpdateCoordinator(hass, entry, connector)
-    await coordinator.async_config_entry_first_refresh()
+    await coordinator.commands.async_load()
+    entry.async_on_unload(coordinator.commands.async_shutdown)
+    entry.async_on_unload(coordinator.snapshot.async_shutdown)
+    if coordinator.logged_in and not await coordinator.async_use_login_state():
+        await coordinator.async_config_entry_first_refresh()
     entry.runtime_data = coordinator
 
     setup_devices(hass, entry)
 
     entry.async_on_unload(entry.add_update_listener(async_reload_entry))
 
-    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    # Only forward the platforms that have entities, so unused platform
+    # modules are neither imported nor run their discovery.
+    coordinator.platforms = platforms_in_use(coordinator)
+    start = time.perf_counter()
+    await hass.config_entries.async_forward_entry_setups(entry, coordinator.platforms)
+    _LOGGER.debug(
+        "Set up platforms %s in %.3f s",
+        sorted(coordinator.platforms),
+        time.perf_counter() - start,
+    )
+
+    coordinator.first_state_seconds = time.perf_counter() - setup_start
+    _LOGGER.debug(
+        "First Compit states written %.3f s after setup started",
+        coordinator.first_state_seconds,
+    )
+
+    setup_late_platforms(hass, entry)
+    entry.async_on_unload(coordinator.async_track_entity_registry())
     return True
 
 
+def setup_late_platforms(hass: HomeAssistant, entry: CompitConfigEntry) -> None:
+    """Forward platforms that become needed when new devices appear."""
+    coordinator = entry.runtime_data
+    known_device_ids = set(coordinator.data)
+
+    @callback
+    def forward_new_platforms() -> None:
+        """Forward platforms needed by devices added since the last refresh."""
+        nonlocal known_device_ids
+        if known_device_ids.issuperset(coordinator.data):
+            return
+        known_device_ids = set(coordinator.data)
+
+        new_platforms = platforms_in_use(coordinator) - coordinator.platforms
+        if not new_platforms:
+            return
+
+        _LOGGER.debug("Forwarding late platforms %s", sorted(new_platforms))
+        coordinator.platforms |= new_platforms
+        entry.async_create_task(
+            hass,
+            hass.config_entries.async_late_forward_entry_setups(entry, new_platforms),
+        )
+
+    entry.async_on_unload(coordinator.async_add_listener(forward_new_platforms))
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: CompitConfigEntry) -> bool:
     """Unload an entry for the Compit integration."""
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    return await hass.config_entries.async_unload_platforms(
+        entry,
+        entry.runtime_data.platforms,
+    )
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: CompitConfigEntry) -> None:
+    """Remove the data stored for a removed entry."""
+    await async_remove_command_queue(hass, entry.entry_id)
+    await async_remove_snapshot(hass, entry.entry_id)
 
 
 async def async_reload_entry(hass: HomeAssistant, entry: CompitConfigEntry) -> None:
@@ -28,21 +28,21 @@ from homeassistant.components.climate.const import (
 from homeassistant.const import ATTR_TEMPERATURE, UnitOfTemperature
 from homeassistant.exceptions import ServiceValidationError
 from homeassistant.helpers.device_registry import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from propcache.api import cached_property
 
 from .const import DOMAIN, MANUFACTURER_NAME
-from .coordinator import CompitConfigEntry, CompitDataUpdateCoordinator
+from .discovery import async_add_entities_in_batches, climate_devices
+from .entity import CompitEntity
 
 if TYPE_CHECKING:
     from compit_inext_api import Param, Parameter
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 
+    from .coordinator import CompitConfigEntry, CompitDataUpdateCoordinator
+
 _LOGGER: logging.Logger = logging.getLogger(__name__)
 
-# Device class for climate devices in Compit system
-CLIMATE_DEVICE_CLASS = 10
 PARALLEL_UPDATES = 0
 
 COMPIT_MODE_MAP = {
@@ -80,27 +80,24 @@ async def async_setup_entry(
     """Set up the CompitClimate platform from a config entry."""
 
     coordinator = entry.runtime_data
-    climate_entities = []
-    for device_id in coordinator.connector.all_devices:
-        device = coordinator.connector.all_devices[device_id]
-
-        if device.definition.device_class == CLIMATE_DEVICE_CLASS:
-            climate_entities.append(
-                CompitClimate(
-                    coordinator,
-                    device_id,
-                    {
-                        parameter.parameter_code: parameter
-                        for parameter in device.definition.parameters
-                    },
-                    device.definition.name,
-                ),
+    await async_add_entities_in_batches(
+        async_add_entities,
+        (
+            CompitClimate(
+                coordinator,
+                device_id,
+                {
+                    parameter.parameter_code: parameter
+                    for parameter in device.definition.parameters
+                },
+                device.definition.name,
             )
-
-    async_add_entities(climate_entities)
+            for device_id, device in climate_devices(coordinator)
+        ),
+    )
 
 
-class CompitClimate(CoordinatorEntity[CompitDataUpdateCoordinator], ClimateEntity):
+class CompitClimate(CompitEntity, ClimateEntity):
     """Representation of a Compit climate device."""
 
     _attr_temperature_unit = UnitOfTemperature.CELSIUS
@@ -142,10 +139,7 @@ class CompitClimate(CoordinatorEntity[CompitDataUpdateCoordinator], ClimateEntit
     @property
     def available(self) -> bool:
         """Return if entity is available."""
-        return (
-            super().available
-            and self.device_id in self.coordinator.connector.all_devices
-        )
+        return super().available and self.device_id in self.coordinator.devices
 
     @property
     def current_temperature(self) -> float | None:
@@ -263,16 +257,15 @@ class CompitClimate(CoordinatorEntity[CompitDataUpdateCoordinator], ClimateEntit
         value: float,
     ) -> None:
         """Call the API to set a parameter to a new value."""
-        await self.coordinator.connector.set_device_parameter(
+        await self.coordinator.async_set_parameter(
             self.device_id,
             parameter,
             value,
         )
-        await self.coordinator.async_request_refresh()
 
     def get_parameter_value(self, parameter: CompitParameter) -> Param | None:
         """Get the parameter value from the device state."""
-        return self.coordinator.connector.get_device_parameter(
+        return self.coordinator.get_parameter(
             self.device_id,
             parameter,
         )
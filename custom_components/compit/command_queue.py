@@ -0,0 +1,300 @@
+"""Durable queue of outbound Compit parameter writes."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import ClientError
+from compit_inext_api import CannotConnect, CompitApiConnector, InvalidAuth
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .session import WRITE_TIMEOUT
+from .tracing import CompitTracer, span
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Mapping
+    from datetime import datetime
+
+_LOGGER: logging.Logger = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+SAVE_DELAY = 1
+
+RETRY_BASE_DELAY = 5
+RETRY_MAX_DELAY = 600
+# Commands that could not be delivered within this time are dropped.
+MAX_COMMAND_AGE = 24 * 3600
+# Refreshes that may still show the old value before a sent command is resent.
+MAX_UNCONFIRMED_REFRESHES = 3
+
+
+@dataclass
+class QueuedCommand:
+    """A parameter write waiting for delivery or confirmation."""
+
+    device_id: int
+    parameter: str
+    value: float
+    created: float
+    attempts: int = 0
+    next_attempt: float = 0.0
+    sent: bool = False
+    unconfirmed_refreshes: int = 0
+
+
+def _command_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Return the store that persists the queue of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.commands")
+
+
+async def async_remove_command_queue(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove the persisted queue of a removed config entry."""
+    await _command_store(hass, entry_id).async_remove()
+
+
+def _values_match(expected: float, actual: object) -> bool:
+    """Return whether a reported parameter value matches a written one."""
+    try:
+        return abs(float(actual) - float(expected)) < 1e-6  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return actual == expected
+
+
+class CompitCommandQueue:
+    """Persistent per-entry queue of parameter writes.
+
+    Writes to the same device parameter are merged, so only the latest value
+    is delivered. Undelivered writes are retried with exponential backoff and
+    delivered writes stay queued until a refresh reports the new value.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry_id: str,
+        connector: CompitApiConnector,
+        tracer: CompitTracer,
+    ) -> None:
+        """Initialize the queue."""
+        self.hass = hass
+        self.connector = connector
+        self.tracer = tracer
+        self._store = _command_store(hass, entry_id)
+        self._commands: dict[tuple[int, str], QueuedCommand] = {}
+        self._cancel_retry: CALLBACK_TYPE | None = None
+        self._retry_at = 0.0
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._commands
+
+    def __iter__(self) -> Iterator[tuple[int, str]]:
+        return iter(self._commands)
+
+    def keys(self) -> frozenset[tuple[int, str]]:
+        """Return the parameters that have a queued command."""
+        return frozenset(self._commands)
+
+    @property
+    def depth(self) -> int:
+        """Return the number of queued commands."""
+        return len(self._commands)
+
+    @property
+    def oldest_age(self) -> float | None:
+        """Return the age in seconds of the oldest queued command."""
+        if not self._commands:
+            return None
+        return time.time() - min(cmd.created for cmd in self._commands.values())
+
+    def pending_value(self, device_id: int, parameter: str) -> float | None:
+        """Return the value of a delivered write that is not confirmed yet."""
+        command = self._commands.get((device_id, parameter))
+        if command is None or not command.sent:
+            return None
+        return command.value
+
+    async def async_load(self) -> None:
+        """Load the commands that were queued before a restart."""
+        if (data := await self._store.async_load()) is None:
+            return
+
+        for item in data.get("commands", []):
+            command = QueuedCommand(**item)
+            # Everything loaded is resent, the device may have been reset.
+            command.sent = False
+            command.next_attempt = 0.0
+            self._commands[(command.device_id, command.parameter)] = command
+
+        if self._commands:
+            _LOGGER.debug("Loaded %d queued Compit commands", len(self._commands))
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Stop retrying; queued commands stay persisted for the next start."""
+        if self._cancel_retry is not None:
+            self._cancel_retry()
+            self._cancel_retry = None
+
+    async def async_enqueue(
+        self,
+        device_id: int,
+        parameter: str,
+        value: float,
+    ) -> bool:
+        """Queue a write, replacing any queued value, and try to deliver it.
+
+        Returns whether the write was delivered right away. Raises
+        HomeAssistantError if the cloud rejected it.
+        """
+        command = QueuedCommand(device_id, parameter, value, created=time.time())
+        self._commands[(device_id, parameter)] = command
+        self._async_schedule_save()
+        return await self._async_send(command)
+
+    @callback
+    def async_verify(self, values: Mapping[tuple[int, str], object]) -> None:
+        """Check queued commands against the values of a successful refresh."""
+        now = time.time()
+        removed = False
+        for key, command in list(self._commands.items()):
+            if command.sent and _values_match(command.value, values.get(key)):
+                del self._commands[key]
+                removed = True
+                continue
+
+            if now - command.created > MAX_COMMAND_AGE:
+                _LOGGER.warning(
+                    "Dropping Compit command %s=%s for device %s after %d attempts",
+                    command.parameter,
+                    command.value,
+                    command.device_id,
+                    command.attempts,
+                )
+                del self._commands[key]
+                removed = True
+                continue
+
+            if command.sent:
+                command.unconfirmed_refreshes += 1
+                if command.unconfirmed_refreshes >= MAX_UNCONFIRMED_REFRESHES:
+                    command.sent = False
+                    command.next_attempt = now
+
+        # The other changes are reset when the queue is loaded, so only
+        # confirmed and expired commands are worth a write.
+        if removed:
+            self._async_schedule_save()
+        # Undelivered commands keep their backoff.
+        waiting = [
+            command.next_attempt
+            for command in self._commands.values()
+            if not command.sent
+        ]
+        if waiting:
+            self._async_schedule_retry(max(min(waiting) - now, 0))
+
+    async def _async_send(self, command: QueuedCommand) -> bool:
+        """Deliver a command and schedule a retry if that fails."""
+        command.attempts += 1
+        try:
+            async with asyncio.timeout(WRITE_TIMEOUT), span("send"):
+                result = await self.connector.set_device_parameter(
+                    command.device_id,
+                    command.parameter,
+                    command.value,
+                )
+        except (CannotConnect, InvalidAuth, ClientError, TimeoutError) as err:
+            _LOGGER.debug("Failed to send Compit command, will retry: %s", err)
+            result = None
+        except ValueError as err:
+            # The library raises this for any response with an error status,
+            # e.g. for a value out of range, so resending cannot succeed.
+            self._async_drop(command)
+            raise HomeAssistantError(
+                f"Compit rejected {command.parameter}={command.value} "
+                f"for device {command.device_id}: {err}",
+            ) from err
+
+        # The library returns None instead of raising on connection errors.
+        if not result:
+            delay = min(
+                RETRY_BASE_DELAY * 2 ** (command.attempts - 1),
+                RETRY_MAX_DELAY,
+            )
+            command.next_attempt = time.time() + delay
+            self._async_schedule_retry(delay)
+            self._async_schedule_save()
+            return False
+
+        command.sent = True
+        command.unconfirmed_refreshes = 0
+        self._async_schedule_save()
+        return True
+
+    @callback
+    def _async_schedule_retry(self, delay: float) -> None:
+        """Schedule a retry round unless an earlier one is already scheduled."""
+        retry_at = time.time() + delay
+        if self._cancel_retry is not None:
+            if self._retry_at <= retry_at:
+                return
+            self._cancel_retry()
+        self._retry_at = retry_at
+        self._cancel_retry = async_call_later(self.hass, delay, self._async_retry)
+
+    async def _async_retry(self, _now: datetime) -> None:
+        """Resend the commands whose backoff has passed."""
+        self._cancel_retry = None
+        now = time.time()
+        due = [
+            command
+            for command in self._commands.values()
+            if not command.sent and command.next_attempt <= now
+        ]
+        for command in due:
+            # A newer write for the same parameter may have replaced it.
+            if self._commands.get((command.device_id, command.parameter)) is command:
+                with self.tracer.trace(
+                    "retry",
+                    device_id=command.device_id,
+                    parameter=command.parameter,
+                    attempt=command.attempts + 1,
+                ):
+                    try:
+                        await self._async_send(command)
+                    except HomeAssistantError as err:
+                        _LOGGER.warning("Dropping Compit command: %s", err)
+
+        waiting = [
+            command.next_attempt
+            for command in self._commands.values()
+            if not command.sent
+        ]
+        if waiting and self._cancel_retry is None:
+            self._async_schedule_retry(max(min(waiting) - time.time(), 0))
+
+    @callback
+    def _async_drop(self, command: QueuedCommand) -> None:
+        """Remove a command, unless a newer write has replaced it."""
+        key = (command.device_id, command.parameter)
+        if self._commands.get(key) is command:
+            del self._commands[key]
+            self._async_schedule_save()
+
+    @callback
+    def _async_schedule_save(self) -> None:
+        """Persist the queue after a short delay."""
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {"commands": [asdict(command) for command in self._commands.values()]}
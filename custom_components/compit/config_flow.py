@@ -7,11 +7,31 @@ from typing import TYPE_CHECKING, Any
 
 import voluptuous as vol
 from compit_inext_api import CannotConnect, CompitApiConnector, InvalidAuth
-from homeassistant.config_entries import SOURCE_REAUTH, ConfigFlow, ConfigFlowResult
+from homeassistant.config_entries import (
+    SOURCE_REAUTH,
+    ConfigEntry,
+    ConfigFlow,
+    ConfigFlowResult,
+    OptionsFlow,
+)
 from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-
-from .const import DOMAIN
+from homeassistant.core import callback
+from homeassistant.helpers import selector
+
+from .const import (
+    CONF_EVENT_PARAMETERS,
+    CONF_SENSOR_DEADBANDS,
+    CONF_SENSOR_MAX_SILENCE,
+    CONF_SENSOR_MIN_INTERVAL,
+    CONF_TRACING,
+    CONF_UPDATE_MODE,
+    DEFAULT_SENSOR_MAX_SILENCE,
+    DEFAULT_SENSOR_MIN_INTERVAL,
+    DOMAIN,
+    UPDATE_MODE_ADAPTIVE,
+    UPDATE_MODE_POLLING,
+)
+from .session import async_get_compit_session
 
 if TYPE_CHECKING:
     from collections.abc import Mapping
@@ -31,12 +51,58 @@ STEP_REAUTH_SCHEMA = vol.Schema(
     },
 )
 
+SECONDS_SELECTOR = selector.NumberSelector(
+    selector.NumberSelectorConfig(
+        min=0,
+        max=86400,
+        step=1,
+        unit_of_measurement="s",
+        mode=selector.NumberSelectorMode.BOX,
+    ),
+)
+
+OPTIONS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(
+            CONF_UPDATE_MODE,
+            default=UPDATE_MODE_POLLING,
+        ): selector.SelectSelector(
+            selector.SelectSelectorConfig(
+                options=[UPDATE_MODE_POLLING, UPDATE_MODE_ADAPTIVE],
+                translation_key=CONF_UPDATE_MODE,
+            ),
+        ),
+        vol.Optional(
+            CONF_SENSOR_MIN_INTERVAL,
+            default=DEFAULT_SENSOR_MIN_INTERVAL,
+        ): SECONDS_SELECTOR,
+        vol.Optional(
+            CONF_SENSOR_MAX_SILENCE,
+            default=DEFAULT_SENSOR_MAX_SILENCE,
+        ): SECONDS_SELECTOR,
+        vol.Optional(CONF_SENSOR_DEADBANDS): selector.ObjectSelector(),
+        vol.Optional(CONF_EVENT_PARAMETERS, default=[]): selector.TextSelector(
+            selector.TextSelectorConfig(multiple=True),
+        ),
+        vol.Optional(CONF_TRACING, default=False): selector.BooleanSelector(),
+    },
+)
+
+# Deadband overrides map a parameter code or a unit to a non-negative number.
+DEADBANDS_SCHEMA = vol.Schema({str: vol.All(vol.Coerce(float), vol.Range(min=0))})
+
 
 class CompitConfigFlow(ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Compit."""
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(_config_entry: ConfigEntry) -> CompitOptionsFlow:
+        """Create the options flow."""
+        return CompitOptionsFlow()
+
     async def async_step_user(
         self,
         user_input: dict[str, Any] | None = None,
@@ -44,7 +110,7 @@ class CompitConfigFlow(ConfigFlow, domain=DOMAIN):
         """Handle the initial step."""
         errors: dict[str, str] = {}
         if user_input is not None:
-            session = async_get_clientsession(self.hass)
+            session = async_get_compit_session(self.hass)
             api = CompitApiConnector(session)
             success = False
             try:
@@ -115,3 +181,34 @@ class CompitConfigFlow(ConfigFlow, domain=DOMAIN):
             description_placeholders={CONF_EMAIL: reauth_entry_data[CONF_EMAIL]},
             errors=errors,
         )
+
+
+class CompitOptionsFlow(OptionsFlow):
+    """Handle Compit options."""
+
+    async def async_step_init(
+        self,
+        user_input: dict[str, Any] | None = None,
+    ) -> ConfigFlowResult:
+        """Manage the update mode and sensor state filter options."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            try:
+                deadbands = DEADBANDS_SCHEMA(
+                    user_input.get(CONF_SENSOR_DEADBANDS) or {},
+                )
+            except vol.Invalid:
+                errors[CONF_SENSOR_DEADBANDS] = "invalid_deadbands"
+            else:
+                return self.async_create_entry(
+                    data={**user_input, CONF_SENSOR_DEADBANDS: deadbands},
+                )
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=self.add_suggested_values_to_schema(
+                OPTIONS_SCHEMA,
+                user_input or self.config_entry.options,
+            ),
+            errors=errors,
+        )
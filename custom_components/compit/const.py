@@ -2,3 +2,29 @@
 
 DOMAIN = "compit"
 MANUFACTURER_NAME = "Compit"
+
+# Device class for climate devices in Compit system
+CLIMATE_DEVICE_CLASS = 10
+
+BOOLEAN_PARAM_TYPE = "Boolean"
+NUMERIC_PARAM_TYPE = "Numeric"
+SELECT_PARAM_TYPE = "Select"
+SENSOR_PARAM_TYPE = "Sensor"
+
+CONF_SENSOR_DEADBANDS = "sensor_deadbands"
+CONF_SENSOR_MIN_INTERVAL = "sensor_min_interval"
+CONF_SENSOR_MAX_SILENCE = "sensor_max_silence"
+
+DEFAULT_SENSOR_MIN_INTERVAL = 0
+DEFAULT_SENSOR_MAX_SILENCE = 900
+
+CONF_UPDATE_MODE = "update_mode"
+
+UPDATE_MODE_POLLING = "polling"
+UPDATE_MODE_ADAPTIVE = "adaptive"
+
+CONF_TRACING = "tracing"
+
+CONF_EVENT_PARAMETERS = "event_parameters"
+
+EVENT_PARAMETER_CHANGED = f"{DOMAIN}_parameter_changed"
@@ -1,22 +1,58 @@
 """Define an object to manage fetching Compit data."""
 
+import asyncio
+import copy
 import logging
+import sys
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass, field
 from datetime import timedelta
+from functools import partial
 
 from compit_inext_api import (
     CannotConnect,
     CompitApiConnector,
     DeviceInstance,
     InvalidAuth,
+    Param,
 )
+from compit_inext_api.consts import CompitParameter
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD, Platform
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed, HomeAssistantError
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .const import DOMAIN
+from .command_queue import CompitCommandQueue
+from .const import (
+    CONF_EVENT_PARAMETERS,
+    CONF_UPDATE_MODE,
+    DOMAIN,
+    EVENT_PARAMETER_CHANGED,
+    UPDATE_MODE_ADAPTIVE,
+)
+from .discovery import control_codes
+from .history import HistoryBuffer
+from .profiling import DATA_PROFILER, PHASE_NOTIFY, PHASE_REFRESH
+from .raw_values import RawValueStore
+from .session import POLL_TIMEOUT, async_get_http_stats, count_response_bytes
+from .snapshot import CompitSnapshot
+from .tracing import async_get_tracer, span
 
 SCAN_INTERVAL = timedelta(seconds=30)
+# In adaptive mode the interval doubles after every refresh in which no
+# setpoint, mode or switch changed, up to this limit, and drops back to
+# SCAN_INTERVAL when one of them changes or is written. The limit bounds the
+# latency of changes made outside Home Assistant.
+MAX_ADAPTIVE_SCAN_INTERVAL = timedelta(minutes=2)
+# Entities only write their state when a refresh changed their data, except
+# on every this many refreshes, when all of them write it.
+FULL_SYNC_REFRESHES = 20
+# Snapshots with more parameters than this are merged and diffed on an
+# executor thread, so large accounts do not block the event loop.
+OFFLOAD_PARAMETERS = 2000
 _LOGGER: logging.Logger = logging.getLogger(__name__)
 
 type CompitConfigEntry = ConfigEntry[CompitDataUpdateCoordinator]
@@ -33,6 +69,50 @@ class CompitDataUpdateCoordinator(DataUpdateCoordinator[dict[int, DeviceInstance
     ) -> None:
         """Initialize."""
         self.connector = connector
+        self.platforms: set[Platform] = set()
+        self.raw_values = RawValueStore()
+        self.history = HistoryBuffer()
+        self.profiler = hass.data[DATA_PROFILER]
+        self.tracer = async_get_tracer(hass, config_entry)
+        self.commands = CompitCommandQueue(
+            hass,
+            config_entry.entry_id,
+            connector,
+            self.tracer,
+        )
+        self.http_stats = async_get_http_stats(hass)
+        self.snapshot = CompitSnapshot(hass, config_entry.entry_id)
+        # Whether the connector is logged in; if not, the devices and values
+        # were restored from the snapshot and are stale.
+        self.logged_in = True
+        self.stale = False
+        self._restored_devices: dict[int, DeviceInstance] = {}
+        self.first_state_seconds: float | None = None
+        self.adaptive = (
+            config_entry.options.get(CONF_UPDATE_MODE) == UPDATE_MODE_ADAPTIVE
+        )
+        self._params: dict[tuple[int, str], Param] = {}
+        self._control_codes: dict[int, frozenset[str]] = {}
+        self._values: dict[tuple[int, str], object] = {}
+        # Copies of parameters showing the value of a delivered write that no
+        # refresh confirmed yet.
+        self._pending: dict[tuple[int, str], Param] = {}
+        # Parameters and whole devices with an enabled entity; None while the
+        # entity registry has no entities of this entry yet.
+        self._wanted: set[tuple[int, str]] | None = None
+        self._wanted_devices: set[int] = set()
+        self._wanted_outdated = False
+        # Parameter codes that fire an event when their value changes.
+        self._event_parameters: frozenset[str] = frozenset(
+            config_entry.options.get(CONF_EVENT_PARAMETERS, []),
+        )
+        self._pending_events: list[dict[str, object]] = []
+        self._refreshes = 0
+        self.changed: set[tuple[int, str]] = set()
+        self.changed_devices: set[int] = set()
+        self.full_sync = True
+        self.last_refresh: dict[str, float] = {}
+        self.max_loop_stall = 0.0
 
         super().__init__(
             hass,
@@ -43,14 +123,520 @@ class CompitDataUpdateCoordinator(DataUpdateCoordinator[dict[int, DeviceInstance
         )
 
     async def _async_update_data(self) -> dict[int, DeviceInstance]:
-        """Update data via library."""
+        """Update data via library, traced as one refresh."""
+        with self.tracer.trace("refresh"):
+            return await self._async_fetch_data()
+
+    async def _async_fetch_data(self) -> dict[int, DeviceInstance]:
+        """Fetch the state of all devices and post-process the snapshot.
+
+        Only the post-processing on the event loop is attributed to the
+        refresh phase, not the time spent waiting for the cloud.
+        """
+        start = time.perf_counter()
+        blocks = sys.getallocatedblocks()
         try:
-            await self.connector.update_state(device_id=None)  # Update all devices
+            with count_response_bytes() as received:
+                async with asyncio.timeout(POLL_TIMEOUT):
+                    logging_in = not self.logged_in
+                    if logging_in:
+                        with span("login"):
+                            await self._async_login()
+                    # Logging in loads the state of the devices as well.
+                    if not logging_in or not _have_state(self.connector.all_devices):
+                        with span("fetch"):
+                            # Update all devices
+                            await self.connector.update_state(device_id=None)
+        except ConfigEntryAuthFailed:
+            raise
         except InvalidAuth as err:
             raise ConfigEntryAuthFailed("Invalid authentication") from err
         except CannotConnect as err:
+            if not self.logged_in:
+                return self._keep_restored_devices(err)
             raise UpdateFailed("Failed to connect") from err
+        except TimeoutError as err:
+            if not self.logged_in:
+                return self._keep_restored_devices(err)
+            raise UpdateFailed("Timeout while fetching data") from err
         except Exception as err:
             raise UpdateFailed("Unexpected error") from err
+        fetched = time.perf_counter()
 
+        processing = await self._async_process_state()
+        self.last_refresh = {
+            "fetch_seconds": round(fetched - start, 6),
+            "response_bytes": received.response_bytes,
+            **processing,
+            "allocated_blocks": sys.getallocatedblocks() - blocks,
+        }
+        _LOGGER.debug("Refreshed Compit data: %s", self.last_refresh)
         return self.connector.all_devices
+
+    @property
+    def devices(self) -> dict[int, DeviceInstance]:
+        """Return the devices, restored from the snapshot until logged in."""
+        if self.logged_in:
+            return self.connector.all_devices
+        return self._restored_devices
+
+    def get_device(self, device_id: int) -> DeviceInstance | None:
+        """Return a device, restored from the snapshot until logged in."""
+        return self.devices.get(device_id)
+
+    async def async_restore_snapshot(self) -> bool:
+        """Set up from the snapshot while the cloud is unreachable.
+
+        The entities are created from the saved devices and show the saved
+        values, marked stale, while every refresh tries to log in again.
+        Returns whether a snapshot was restored.
+        """
+        if (devices := await self.snapshot.async_load()) is None:
+            return False
+
+        # Entities only read the attributes the snapshot restores.
+        self._restored_devices = devices  # type: ignore[assignment]
+        self.logged_in = False
+        self.stale = True
+        self.last_refresh = await self._async_process_state()
+        self.data = self._restored_devices
+        return True
+
+    async def _async_login(self) -> None:
+        """Log in after a setup from the snapshot.
+
+        The entry is reloaded if the devices or their parameters changed, as
+        the entities were created from the saved ones.
+        """
+        connected = await self.connector.init(
+            self.config_entry.data[CONF_EMAIL],
+            self.config_entry.data[CONF_PASSWORD],
+            self.hass.config.language,
+        )
+        if not connected:
+            raise ConfigEntryAuthFailed("Authentication API error")
+
+        self.logged_in = True
+        restored, self._restored_devices = self._restored_devices, {}
+        if _definitions(self.connector.all_devices) != _definitions(restored):
+            _LOGGER.info("Compit devices changed while offline, reloading")
+            self.hass.config_entries.async_schedule_reload(self.config_entry.entry_id)
+
+    def _keep_restored_devices(self, err: Exception) -> dict[int, DeviceInstance]:
+        """Keep showing the restored values while the cloud is unreachable."""
+        if self.snapshot.expired:
+            raise UpdateFailed("Failed to connect") from err
+
+        _LOGGER.debug("Compit cloud still unreachable, keeping restored values")
+        self._set_changed(set())
+        self.full_sync = False
+        return self._restored_devices
+
+    async def async_use_login_state(self) -> bool:
+        """Use the device states loaded at login as the first refresh.
+
+        Logging in already loads the state of every device, so entities can
+        be set up from it and the first refresh can follow one update
+        interval later. Returns False if a device has no state to use.
+        """
+        devices = self.connector.all_devices
+        if not _have_state(devices):
+            return False
+
+        self.last_refresh = await self._async_process_state()
+        self.data = devices
+        _LOGGER.debug("Used Compit login state: %s", self.last_refresh)
+        return True
+
+    async def _async_process_state(self) -> dict[str, float]:
+        """Merge the device states into the index and return statistics."""
+        start = time.perf_counter()
+        with span("merge"):
+            if self._wanted_outdated:
+                self._update_wanted()
+            with self.profiler.phase(PHASE_REFRESH):
+                # Writes change parameter values on the loop, so the merge only
+                # gets copies of them.
+                states = [
+                    (
+                        device_id,
+                        device.state.params,
+                        [param.value for param in device.state.params],
+                    )
+                    for device_id, device in self.devices.items()
+                ]
+                # Restored parameters must not end up in the library's lists.
+                previous_params = {} if self.stale else self._params
+                merge = partial(
+                    _merge_snapshot,
+                    states,
+                    previous_params,
+                    {key: param.value for key, param in previous_params.items()},
+                    self._values,
+                    self._wanted,
+                    self._wanted_devices,
+                    self.commands.keys(),
+                    self._event_parameters,
+                )
+            offloaded = sum(len(values) for _, _, values in states) > OFFLOAD_PARAMETERS
+            if offloaded:
+                merging = time.perf_counter()
+                merged = await self.hass.async_add_executor_job(merge)
+                executor_seconds = time.perf_counter() - merging
+            else:
+                with self.profiler.phase(PHASE_REFRESH):
+                    merged = merge()
+                executor_seconds = 0.0
+
+        with self.profiler.phase(PHASE_REFRESH), span("apply"):
+            # The parameter lists of the library are only changed on the loop.
+            for state_params, index, param in merged.reused:
+                state_params[index] = param
+            values = merged.values
+            changed = merged.changed
+            previous = self._values
+            if self._event_parameters:
+                self._pending_events = [
+                    {
+                        "device_id": device_id,
+                        "parameter": code,
+                        "old_value": previous[device_id, code],
+                        "new_value": values.get((device_id, code)),
+                    }
+                    for device_id, code in merged.events
+                ]
+            self._params = merged.params
+            self._values = values
+            if self.logged_in:
+                # Restored values do not confirm writes.
+                self.commands.async_verify(values)
+                self.snapshot.async_schedule_save(self.connector.all_devices)
+            self.stale = not self.logged_in
+            changed |= self._update_pending()
+            self._set_changed(changed)
+            self._refreshes += 1
+            self.full_sync = self._refreshes % FULL_SYNC_REFRESHES == 0
+
+            self.history.record(values, int(time.time()))
+            self._adapt_update_interval(changed=self._controls_changed(changed))
+
+        processed = time.perf_counter()
+        loop_seconds = processed - start - executor_seconds
+        self._record_loop_stall(loop_seconds)
+        return {
+            "process_seconds": round(processed - start, 6),
+            "loop_seconds": round(loop_seconds, 6),
+            "offloaded": offloaded,
+            "parameters": len(values),
+            "changed": len(changed),
+            "reused": len(merged.reused),
+            "skipped": merged.skipped,
+        }
+
+    @callback
+    def async_track_entity_registry(self) -> CALLBACK_TYPE:
+        """Skip parameters of disabled entities, following registry changes."""
+
+        @callback
+        def _registry_filter(data: er.EventEntityRegistryUpdatedData) -> bool:
+            """Return whether the change may enable or disable an entity."""
+            return data["action"] != "update" or "disabled_by" in data["changes"]
+
+        @callback
+        def _registry_updated(_event: Event[er.EventEntityRegistryUpdatedData]) -> None:
+            """Recalculate the wanted parameters on the next refresh."""
+            self._wanted_outdated = True
+
+        self._update_wanted()
+        return self.hass.bus.async_listen(
+            er.EVENT_ENTITY_REGISTRY_UPDATED,
+            _registry_updated,
+            event_filter=_registry_filter,
+        )
+
+    def _update_wanted(self) -> None:
+        """Collect the parameters that have an enabled entity."""
+        self._wanted_outdated = False
+        entities = er.async_entries_for_config_entry(
+            er.async_get(self.hass),
+            self.config_entry.entry_id,
+        )
+        if not entities:
+            self._wanted = None
+            return
+
+        wanted: set[tuple[int, str]] = set()
+        wanted_devices: set[int] = set()
+        for entity in entities:
+            if entity.disabled_by is not None:
+                continue
+
+            if entity.domain == Platform.CLIMATE:
+                # Climate entities use "<device name>_<device id>" as unique id
+                # and show several parameters of their device.
+                device_id = entity.unique_id.rpartition("_")[2]
+                if device_id.isdigit():
+                    wanted_devices.add(int(device_id))
+                continue
+
+            device_id, _, code = entity.unique_id.partition("_")
+            if device_id.isdigit():
+                wanted.add((int(device_id), code))
+
+        self._wanted = wanted
+        self._wanted_devices = wanted_devices
+
+    def get_parameter(
+        self,
+        device_id: int,
+        parameter: CompitParameter | str,
+    ) -> Param | None:
+        """Return the state of a device parameter from the snapshot index."""
+        code = parameter.value if isinstance(parameter, CompitParameter) else parameter
+        key = (device_id, code)
+        if (param := self._pending.get(key)) is not None:
+            return param
+        return self._params.get(key)
+
+    def _update_pending(self) -> set[tuple[int, str]]:
+        """Show the values of delivered writes until a refresh confirms them.
+
+        Refreshes may still report the old value for a while after a write,
+        so the parameter shows the written value in the meantime. Returns
+        the parameters that started or stopped showing a written value.
+        """
+        pending: dict[tuple[int, str], Param] = {}
+        for key in self.commands:
+            value = self.commands.pending_value(*key)
+            param = self._params.get(key)
+            if value is None or param is None or param.value == value:
+                continue
+            # The parameter of the library keeps the value the cloud reported.
+            shown = pending[key] = copy.copy(param)
+            shown.value = value
+
+        previous, self._pending = self._pending, pending
+        return previous.keys() ^ pending.keys()
+
+    def _set_changed(self, changed: set[tuple[int, str]]) -> None:
+        """Remember which parameters the last update changed."""
+        self.changed = changed
+        self.changed_devices = {device_id for device_id, _ in changed}
+
+    def has_changed(self, device_id: int, code: str | None = None) -> bool:
+        """Return whether the last update changed a parameter or a device."""
+        if code is None:
+            return device_id in self.changed_devices
+        return (device_id, code) in self.changed
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify the listeners, attributing the time to the notify phase."""
+        start = time.perf_counter()
+        with (
+            self.tracer.trace("notify"),
+            self.profiler.phase(PHASE_NOTIFY),
+            span("notify"),
+        ):
+            super().async_update_listeners()
+            self._async_fire_events()
+        self._record_loop_stall(time.perf_counter() - start)
+
+    @callback
+    def _async_fire_events(self) -> None:
+        """Fire the parameter change events of the last refresh.
+
+        They are fired after the listeners were notified, so automations
+        triggered by them see the updated entity states.
+        """
+        events, self._pending_events = self._pending_events, []
+        for data in events:
+            self.hass.bus.async_fire(EVENT_PARAMETER_CHANGED, data)
+
+    def _record_loop_stall(self, seconds: float) -> None:
+        """Track the longest time the event loop was blocked by this entry."""
+        self.max_loop_stall = max(self.max_loop_stall, seconds)
+
+    def _controls_changed(self, changed: set[tuple[int, str]]) -> bool:
+        """Return whether a setpoint, mode or switch is among the changes.
+
+        Measured values change on almost every refresh, so they do not keep
+        the adaptive interval short.
+        """
+        for device_id, code in changed:
+            if (codes := self._control_codes.get(device_id)) is None:
+                device = self.get_device(device_id)
+                if device is None:
+                    continue
+                codes = self._control_codes[device_id] = control_codes(device)
+            if code in codes:
+                return True
+        return False
+
+    def _adapt_update_interval(self, *, changed: bool) -> None:
+        """Back off polling while no controls change in adaptive mode."""
+        if not self.adaptive or self.update_interval is None:
+            return
+
+        if changed:
+            self.update_interval = SCAN_INTERVAL
+        else:
+            self.update_interval = min(
+                self.update_interval * 2,
+                MAX_ADAPTIVE_SCAN_INTERVAL,
+            )
+
+    async def async_set_parameter(
+        self,
+        device_id: int,
+        parameter: CompitParameter | str,
+        value: float,
+    ) -> None:
+        """Queue a device parameter write and show the new value right away.
+
+        The cloud API offers no push updates, so the written value is shown
+        until a refresh reports it, or the write is given up. Writes
+        that cannot be delivered stay queued and are retried, writes the
+        cloud rejects raise HomeAssistantError.
+        """
+        code = parameter.value if isinstance(parameter, CompitParameter) else parameter
+        if not self.logged_in:
+            raise HomeAssistantError("The Compit cloud is unreachable")
+        with self.tracer.trace("write", device_id=device_id, parameter=code):
+            if not await self.commands.async_enqueue(device_id, code, value):
+                _LOGGER.warning(
+                    "Could not send %s=%s to Compit device %s, queued for retry",
+                    code,
+                    value,
+                    device_id,
+                )
+                return
+
+            if (device_id, code) in self._params:
+                self._update_pending()
+                self._set_changed({(device_id, code)})
+                self.full_sync = False
+                self.async_update_listeners()
+
+            self._adapt_update_interval(changed=True)
+
+        await self.async_request_refresh()
+
+
+def _have_state(devices: Mapping[int, DeviceInstance]) -> bool:
+    """Return whether every device has a state."""
+    return all(
+        getattr(device, "state", None) is not None for device in devices.values()
+    )
+
+
+def _definitions(
+    devices: Mapping[int, DeviceInstance],
+) -> dict[int, tuple[str, list[str]]]:
+    """Return the names and parameter codes of the devices, to compare them."""
+    return {
+        device_id: (
+            device.definition.name,
+            [
+                parameter.parameter_code
+                for parameter in device.definition.parameters or []
+                if parameter is not None
+            ],
+        )
+        for device_id, device in devices.items()
+    }
+
+
+def _same_param(old: Param, new: Param) -> bool:
+    """Return whether two versions of a parameter agree apart from the value.
+
+    The caller compares the values, from copies taken on the event loop.
+    """
+    try:
+        old_attrs, new_attrs = vars(old), vars(new)
+    except TypeError:
+        return old.hidden == new.hidden
+    return old_attrs.keys() == new_attrs.keys() and all(
+        old_attrs[name] == new_attrs[name] for name in old_attrs if name != "value"
+    )
+
+
+@dataclass(slots=True)
+class _MergedSnapshot:
+    """Result of merging a snapshot, to be applied on the event loop."""
+
+    params: dict[tuple[int, str], Param] = field(default_factory=dict)
+    values: dict[tuple[int, str], object] = field(default_factory=dict)
+    changed: set[tuple[int, str]] = field(default_factory=set)
+    # Parameters that changed and fire an event.
+    events: list[tuple[int, str]] = field(default_factory=list)
+    # Positions in the parameter lists of the library to put the previous,
+    # equal parameter objects back into.
+    reused: list[tuple[list[Param], int, Param]] = field(default_factory=list)
+    skipped: int = 0
+
+
+def _merge_snapshot(
+    states: list[tuple[int, list[Param], list[object]]],
+    previous_params: Mapping[tuple[int, str], Param],
+    previous_param_values: Mapping[tuple[int, str], object],
+    previous_values: Mapping[tuple[int, str], object],
+    wanted: set[tuple[int, str]] | None,
+    wanted_devices: set[int],
+    queued: frozenset[tuple[int, str]],
+    event_parameters: frozenset[str],
+) -> _MergedSnapshot:
+    """Index and diff a snapshot against the previous one.
+
+    Parameters equal to their previous version are swapped back for the
+    previous object, so the fresh copies can be freed right away and
+    long-lived objects are not replaced every poll. Parameters without an
+    enabled entity, a queued command or an event subscription are left out.
+
+    The states hold the parameter list and copies of the parameter values of
+    every device, and the previous parameter values are copies as well. Only
+    attributes that are not changed on the event loop are read from the
+    parameters, so this can run on an executor thread.
+    """
+    merged = _MergedSnapshot()
+    params = merged.params
+    values = merged.values
+    for device_id, state_params, state_values in states:
+        whole_device = wanted is None or device_id in wanted_devices
+        for index, (param, value) in enumerate(
+            zip(state_params, state_values, strict=True),
+        ):
+            key = (device_id, param.code)
+            if (
+                not whole_device
+                and key not in wanted
+                and key not in queued
+                and param.code not in event_parameters
+            ):
+                merged.skipped += 1
+                continue
+
+            old = previous_params.get(key)
+            if (
+                old is not None
+                and old is not param
+                and previous_param_values[key] == value
+                and _same_param(old, param)
+            ):
+                merged.reused.append((state_params, index, old))
+                params[key] = old
+            else:
+                params[key] = param
+            values[key] = value
+
+    changed = merged.changed
+    changed.update(
+        key
+        for key, value in values.items()
+        if key not in previous_values or previous_values[key] != value
+    )
+    changed.update(previous_values.keys() - values.keys())
+    merged.events = [
+        key for key in changed if key[1] in event_parameters and key in previous_values
+    ]
+    return merged
@@ -0,0 +1,61 @@
+"""Diagnostics support for the Compit integration."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from dataclasses import asdict
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+    from .coordinator import CompitConfigEntry
+
+# The title and unique id of an entry are the email of the account.
+TO_REDACT = {CONF_EMAIL, CONF_PASSWORD, "title", "unique_id"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant,
+    entry: CompitConfigEntry,
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator = entry.runtime_data
+    update_interval = coordinator.update_interval
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "update_interval": update_interval and update_interval.total_seconds(),
+        "platforms": sorted(coordinator.platforms),
+        "devices": len(coordinator.data),
+        "last_refresh": coordinator.last_refresh,
+        "first_state_seconds": coordinator.first_state_seconds,
+        "snapshot": {
+            "logged_in": coordinator.logged_in,
+            "stale": coordinator.stale,
+            "age": coordinator.snapshot.age,
+        },
+        "command_queue": {
+            "depth": coordinator.commands.depth,
+            "oldest_age": coordinator.commands.oldest_age,
+        },
+        "history": {
+            "parameters": len(coordinator.history),
+            "memory_bytes": coordinator.history.memory_bytes,
+        },
+        "raw_values": len(coordinator.raw_values),
+        "http": asdict(coordinator.http_stats),
+        # Counters to compare across reloads when looking for leaks.
+        "runtime": {
+            "coordinator_listeners": len(list(coordinator.async_contexts())),
+            "max_loop_stall": round(coordinator.max_loop_stall, 6),
+            "loaded_entries": len(hass.config_entries.async_loaded_entries(DOMAIN)),
+            "event_loop_tasks": len(asyncio.all_tasks()),
+            "allocated_blocks": sys.getallocatedblocks(),
+        },
+    }
@@ -0,0 +1,216 @@
+"""Entity discovery for the Compit integration.
+
+The platforms and the integration setup share these helpers, so the set of
+platforms forwarded for an entry always matches the entities they create.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import TYPE_CHECKING
+
+from homeassistant.const import Platform
+
+from .const import (
+    BOOLEAN_PARAM_TYPE,
+    CLIMATE_DEVICE_CLASS,
+    NUMERIC_PARAM_TYPE,
+    SELECT_PARAM_TYPE,
+    SENSOR_PARAM_TYPE,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+    from compit_inext_api import DeviceInstance, Parameter
+    from homeassistant.helpers.entity import Entity
+    from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
+
+    from .coordinator import CompitDataUpdateCoordinator
+
+_LOGGER: logging.Logger = logging.getLogger(__name__)
+
+# Entities are created and registered in batches of this size, yielding to
+# the event loop in between, so large accounts do not stall it during setup.
+ENTITY_BATCH_SIZE = 100
+
+
+def _visible_parameters(
+    device: DeviceInstance,
+) -> Iterator[Parameter]:
+    """Yield the device parameters that have a visible state value."""
+    params = {param.code: param for param in device.state.params}
+    for parameter in device.definition.parameters or []:
+        if parameter is None:
+            continue
+
+        device_param = params.get(parameter.parameter_code)
+        if device_param is None or device_param.hidden:
+            continue
+
+        yield parameter
+
+
+def climate_devices(
+    coordinator: CompitDataUpdateCoordinator,
+) -> Iterator[tuple[int, DeviceInstance]]:
+    """Yield the devices exposed as climate entities."""
+    for device_id, device in coordinator.devices.items():
+        if device.definition.device_class == CLIMATE_DEVICE_CLASS:
+            yield device_id, device
+
+
+def number_parameters(
+    coordinator: CompitDataUpdateCoordinator,
+) -> Iterator[tuple[int, DeviceInstance, Parameter]]:
+    """Yield the parameters exposed as number entities."""
+    for device_id in coordinator.devices:
+        device = coordinator.get_device(device_id)
+        if device is None:
+            continue
+
+        for parameter in _visible_parameters(device):
+            if parameter.type != NUMERIC_PARAM_TYPE:
+                continue
+
+            if getattr(parameter, "ReadOnly", False):
+                # Read-only numeric values are exposed as sensors.
+                continue
+
+            yield device_id, device, parameter
+
+
+def select_parameters(
+    coordinator: CompitDataUpdateCoordinator,
+) -> Iterator[tuple[int, DeviceInstance, Parameter]]:
+    """Yield the parameters exposed as select entities."""
+    for device_id in coordinator.devices:
+        device = coordinator.get_device(device_id)
+        if device is None:
+            continue
+
+        for parameter in device.definition.parameters or []:
+            if parameter is not None and parameter.type == SELECT_PARAM_TYPE:
+                yield device_id, device, parameter
+
+
+def sensor_parameters(
+    coordinator: CompitDataUpdateCoordinator,
+) -> Iterator[tuple[int, DeviceInstance, Parameter]]:
+    """Yield the parameters exposed as sensor entities."""
+    for device_id in coordinator.devices:
+        device = coordinator.get_device(device_id)
+        if device is None:
+            continue
+
+        for parameter in _visible_parameters(device):
+            is_sensor = parameter.type == SENSOR_PARAM_TYPE
+            is_readonly = parameter.type == getattr(
+                parameter,
+                "ReadOnly",
+                False,
+            )
+
+            if is_sensor or is_readonly:
+                yield device_id, device, parameter
+
+
+def switch_parameters(
+    coordinator: CompitDataUpdateCoordinator,
+) -> Iterator[tuple[int, DeviceInstance, Parameter]]:
+    """Yield the parameters exposed as switch entities."""
+    for device_id in coordinator.devices:
+        device = coordinator.get_device(device_id)
+        if device is None:
+            continue
+
+        for parameter in _visible_parameters(device):
+            if parameter.type != BOOLEAN_PARAM_TYPE:
+                continue
+
+            if getattr(parameter, "ReadOnly", False):
+                # Boolean read-only values should be exposed as sensors (if needed).
+                continue
+
+            yield device_id, device, parameter
+
+
+def control_codes(device: DeviceInstance) -> frozenset[str]:
+    """Return the codes of the parameters that can be written to a device.
+
+    These are the setpoints, modes and switches, as opposed to measured
+    values that change on their own.
+    """
+    return frozenset(
+        parameter.parameter_code
+        for parameter in device.definition.parameters or []
+        if parameter is not None
+        and (
+            parameter.type == SELECT_PARAM_TYPE
+            or (
+                parameter.type in (BOOLEAN_PARAM_TYPE, NUMERIC_PARAM_TYPE)
+                and not getattr(parameter, "ReadOnly", False)
+            )
+        )
+    )
+
+
+PLATFORM_DISCOVERY: dict[
+    Platform,
+    Callable[[CompitDataUpdateCoordinator], Iterator[tuple]],
+] = {
+    Platform.CLIMATE: climate_devices,
+    Platform.NUMBER: number_parameters,
+    Platform.SELECT: select_parameters,
+    Platform.SENSOR: sensor_parameters,
+    Platform.SWITCH: switch_parameters,
+}
+
+
+def platforms_in_use(coordinator: CompitDataUpdateCoordinator) -> set[Platform]:
+    """Return the platforms that have at least one entity to create."""
+    return {
+        platform
+        for platform, discover in PLATFORM_DISCOVERY.items()
+        if next(discover(coordinator), None) is not None
+    }
+
+
+async def async_add_entities_in_batches(
+    async_add_entities: AddConfigEntryEntitiesCallback,
+    entities: Iterable[Entity],
+    batch_size: int = ENTITY_BATCH_SIZE,
+) -> None:
+    """Add entities in batches, yielding to the event loop between them.
+
+    The entities are consumed lazily, so both their discovery and their
+    construction are spread over the batches.
+    """
+    added = 0
+    longest_stall = 0.0
+    batch: list[Entity] = []
+    start = time.perf_counter()
+    for entity in entities:
+        batch.append(entity)
+        if len(batch) < batch_size:
+            continue
+
+        async_add_entities(batch)
+        added += len(batch)
+        longest_stall = max(longest_stall, time.perf_counter() - start)
+        batch = []
+        await asyncio.sleep(0)
+        start = time.perf_counter()
+
+    if batch:
+        async_add_entities(batch)
+        added += len(batch)
+        longest_stall = max(longest_stall, time.perf_counter() - start)
+
+    _LOGGER.debug(
+        "Added %d entities, longest event loop stall %.3f s",
+        added,
+        longest_stall,
+    )
@@ -0,0 +1,64 @@
+"""Base entity for the Compit integration."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .coordinator import CompitDataUpdateCoordinator
+from .profiling import PHASE_STATE_WRITE
+from .tracing import accumulated_span
+
+if TYPE_CHECKING:
+    from compit_inext_api import Parameter
+
+# Set while the entity shows values restored from the snapshot.
+ATTR_STALE = "stale"
+
+
+class CompitEntity(CoordinatorEntity[CompitDataUpdateCoordinator]):
+    """Base class for Compit entities."""
+
+    device_id: int
+    # The parameter shown by the entity, or None if it shows the whole device.
+    parameter: Parameter | None = None
+    _last_available: bool | None = None
+    _last_stale: bool | None = None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state only if the update changed what the entity shows."""
+        available = self.available
+        stale = self.coordinator.stale
+        force = available != self._last_available or stale != self._last_stale
+        if not self._should_write(available=available, force=force):
+            return
+
+        self._last_available = available
+        self._last_stale = stale
+        super()._handle_coordinator_update()
+
+    def _should_write(self, *, available: bool, force: bool) -> bool:
+        """Return whether the state needs to be written after an update."""
+        if force or self.coordinator.full_sync:
+            return True
+        code = self.parameter.parameter_code if self.parameter else None
+        return available and self.coordinator.has_changed(self.device_id, code)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, object] | None:
+        """Mark the state as stale while it was restored from the snapshot."""
+        if self.coordinator.stale:
+            return {ATTR_STALE: True}
+        return None
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state, attributing the time to the state write phase."""
+        with (
+            self.coordinator.profiler.phase(PHASE_STATE_WRITE),
+            accumulated_span(PHASE_STATE_WRITE),
+        ):
+            super().async_write_ha_state()
@@ -0,0 +1,141 @@
+"""In-memory short-term history of numeric Compit parameters."""
+
+from __future__ import annotations
+
+from array import array
+from typing import TYPE_CHECKING
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+# Three hours of samples at the default 30 s update interval.
+HISTORY_SAMPLES = 360
+
+
+class ParameterHistory:
+    """Fixed-size ring buffer of timestamped samples of one parameter.
+
+    Values are stored as 32 bit floats and timestamps as 32 bit epoch
+    seconds, so every buffer costs 8 bytes per sample regardless of use.
+    """
+
+    __slots__ = ("_count", "_next", "_times", "_values")
+
+    def __init__(self, size: int = HISTORY_SAMPLES) -> None:
+        """Initialize an empty buffer of the given size."""
+        self._values = array("f", [0.0]) * size
+        self._times = array("I", [0]) * size
+        self._next = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def size(self) -> int:
+        """Return the number of samples the buffer can hold."""
+        return len(self._values)
+
+    @property
+    def memory_bytes(self) -> int:
+        """Return the memory used by the sample storage."""
+        values, times = self._values, self._times
+        return values.itemsize * len(values) + times.itemsize * len(times)
+
+    def append(self, timestamp: int, value: float) -> None:
+        """Add a sample, overwriting the oldest one when full."""
+        self._values[self._next] = value
+        self._times[self._next] = timestamp
+        self._next = (self._next + 1) % len(self._values)
+        self._count = min(self._count + 1, len(self._values))
+
+    def samples(self, since: float = 0) -> list[tuple[int, float]]:
+        """Return the samples at or after a timestamp, oldest first."""
+        size = len(self._values)
+        start = (self._next - self._count) % size
+        return [
+            (self._times[index], round(self._values[index], 4))
+            for index in ((start + offset) % size for offset in range(self._count))
+            if self._times[index] >= since
+        ]
+
+
+class HistoryBuffer:
+    """Short-term history of all numeric parameters of a config entry."""
+
+    def __init__(self, size: int = HISTORY_SAMPLES) -> None:
+        """Initialize the history."""
+        self.size = size
+        self._buffers: dict[tuple[int, str], ParameterHistory] = {}
+
+    def __len__(self) -> int:
+        return len(self._buffers)
+
+    @property
+    def memory_bytes(self) -> int:
+        """Return the memory used by the sample storage of all parameters."""
+        return sum(buffer.memory_bytes for buffer in self._buffers.values())
+
+    def get(self, device_id: int, code: str) -> ParameterHistory | None:
+        """Return the history of a parameter."""
+        return self._buffers.get((device_id, code))
+
+    def record(
+        self,
+        values: Mapping[tuple[int, str], object],
+        timestamp: int,
+    ) -> None:
+        """Add a sample for every numeric parameter value.
+
+        A missing or non-numeric reading is skipped and keeps the buffer.
+        Buffers of parameters that are no longer reported at all are dropped,
+        so the history does not grow when devices are replaced or removed.
+        """
+        reported = 0
+        for key, value in values.items():
+            buffer = self._buffers.get(key)
+            if buffer is not None:
+                reported += 1
+            if value is None or isinstance(value, bool):
+                continue
+            try:
+                number = float(value)  # type: ignore[arg-type]
+            except (TypeError, ValueError):
+                continue
+
+            if buffer is None:
+                buffer = self._buffers[key] = ParameterHistory(self.size)
+                reported += 1
+            buffer.append(timestamp, number)
+
+        if reported != len(self._buffers):
+            for key in self._buffers.keys() - values.keys():
+                del self._buffers[key]
+
+
+@callback
+def async_get_entity_history(
+    hass: HomeAssistant,
+    entity_id: str,
+) -> ParameterHistory | None:
+    """Return the history of the parameter behind a Compit entity."""
+    entity = er.async_get(hass).async_get(entity_id)
+    if entity is None or entity.platform != DOMAIN or entity.config_entry_id is None:
+        return None
+
+    entry = hass.config_entries.async_get_entry(entity.config_entry_id)
+    if entry is None or entry.state is not ConfigEntryState.LOADED:
+        return None
+
+    # Parameter entities use "<device id>_<parameter code>" as unique id.
+    device_id, _, code = entity.unique_id.partition("_")
+    if not device_id.isdigit():
+        return None
+
+    return entry.runtime_data.history.get(int(device_id), code)
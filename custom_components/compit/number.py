@@ -6,17 +6,18 @@ from typing import TYPE_CHECKING
 
 from homeassistant.components.number import NumberEntity
 from homeassistant.helpers.device_registry import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN, MANUFACTURER_NAME
-from .coordinator import CompitConfigEntry, CompitDataUpdateCoordinator
+from .discovery import async_add_entities_in_batches, number_parameters
+from .entity import CompitEntity
 
 if TYPE_CHECKING:
     from compit_inext_api import Parameter
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 
-NUMERIC_PARAM_TYPE = "Numeric"
+    from .coordinator import CompitConfigEntry, CompitDataUpdateCoordinator
+
 PARALLEL_UPDATES = 0
 
 
@@ -28,41 +29,21 @@ async def async_setup_entry(
     """Set up Compit number entities from a config entry."""
 
     coordinator = entry.runtime_data
-    number_entities: list[CompitNumber] = []
-
-    for device_id in coordinator.connector.all_devices:
-        device = coordinator.connector.get_device(device_id)
-        if device is None:
-            continue
-
-        for parameter in device.definition.parameters or []:
-            if parameter is None or parameter.type != NUMERIC_PARAM_TYPE:
-                continue
-
-            device_param = next(
-                (p for p in device.state.params if p.code == parameter.parameter_code),
-                None,
-            )
-            if device_param is None or device_param.hidden:
-                continue
-
-            if getattr(parameter, "ReadOnly", False):
-                # Read-only numeric values are exposed as sensors.
-                continue
-
-            number_entities.append(
-                CompitNumber(
-                    coordinator,
-                    device_id,
-                    device.definition.name,
-                    parameter,
-                ),
+    await async_add_entities_in_batches(
+        async_add_entities,
+        (
+            CompitNumber(
+                coordinator,
+                device_id,
+                device.definition.name,
+                parameter,
             )
-
-    async_add_entities(number_entities)
+            for device_id, device, parameter in number_parameters(coordinator)
+        ),
+    )
 
 
-class CompitNumber(CoordinatorEntity[CompitDataUpdateCoordinator], NumberEntity):
+class CompitNumber(CompitEntity, NumberEntity):
     """Representation of a Compit numeric parameter."""
 
     def __init__(
@@ -95,13 +76,13 @@ class CompitNumber(CoordinatorEntity[CompitDataUpdateCoordinator], NumberEntity)
         """Return if entity is available."""
         return (
             super().available
-            and self.coordinator.connector.get_device(self.device_id) is not None
+            and self.coordinator.get_device(self.device_id) is not None
         )
 
     @property
     def native_value(self) -> float | None:
         """Return the current value."""
-        param = self.coordinator.connector.get_device_parameter(
+        param = self.coordinator.get_parameter(
             self.device_id,
             self.parameter.parameter_code,
         )
@@ -114,7 +95,7 @@ class CompitNumber(CoordinatorEntity[CompitDataUpdateCoordinator], NumberEntity)
 
     async def async_set_native_value(self, value: float) -> None:
         """Set new value."""
-        await self.coordinator.connector.set_device_parameter(
+        await self.coordinator.async_set_parameter(
             self.device_id,
             self.parameter.parameter_code,
             value,
@@ -0,0 +1,159 @@
+"""On-demand profiling of the Compit integration hot paths."""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import logging
+import pstats
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from datetime import datetime
+
+_LOGGER: logging.Logger = logging.getLogger(__name__)
+
+DATA_PROFILER: HassKey[CompitProfiler] = HassKey(f"{DOMAIN}_profiler")
+
+PHASE_REFRESH = "refresh"
+PHASE_NOTIFY = "notify"
+PHASE_STATE_WRITE = "state_write"
+
+DEFAULT_PROFILING_DURATION = 60
+MAX_PROFILING_DURATION = 600
+DEFAULT_SUMMARY_LINES = 30
+MAX_SUMMARY_LINES = 500
+
+
+class CompitProfiler:
+    """Bounded cProfile session with time attributed to integration phases."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the profiler."""
+        self.hass = hass
+        self._profile: cProfile.Profile | None = None
+        self._phases: defaultdict[str, float] = defaultdict(float)
+        self._phase_calls: defaultdict[str, int] = defaultdict(int)
+        self._started = 0.0
+        self._summary_lines = DEFAULT_SUMMARY_LINES
+        self._cancel_stop: CALLBACK_TYPE | None = None
+
+    @property
+    def active(self) -> bool:
+        """Return whether a profiling session is running."""
+        return self._profile is not None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Attribute the time spent in the block to a phase while profiling."""
+        if self._profile is None:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._phases[name] += time.perf_counter() - start
+            self._phase_calls[name] += 1
+
+    @callback
+    def async_start(self, duration: float, summary_lines: int) -> None:
+        """Start a profiling session that stops itself after a duration."""
+        if self._profile is not None:
+            raise HomeAssistantError("Compit profiling is already running")
+
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as err:
+            raise HomeAssistantError(f"Cannot start profiling: {err}") from err
+
+        self._profile = profile
+        self._phases.clear()
+        self._phase_calls.clear()
+        self._started = time.perf_counter()
+        self._summary_lines = summary_lines
+        self._cancel_stop = async_call_later(self.hass, duration, self._async_timeout)
+        _LOGGER.info("Compit profiling started for %s s", duration)
+
+    async def _async_timeout(self, _now: datetime) -> None:
+        """Stop the session when its duration has passed."""
+        self._cancel_stop = None
+        await self.async_stop()
+
+    async def async_stop(self) -> dict[str, Any]:
+        """Stop the session and write the profile and a summary to disk."""
+        if (profile := self._profile) is None:
+            raise HomeAssistantError("Compit profiling is not running")
+
+        profile.disable()
+        self._profile = None
+        if self._cancel_stop is not None:
+            self._cancel_stop()
+            self._cancel_stop = None
+
+        elapsed = time.perf_counter() - self._started
+        phases = {
+            name: {"seconds": round(seconds, 6), "calls": self._phase_calls[name]}
+            for name, seconds in self._phases.items()
+        }
+        base_path = self.hass.config.path(
+            f"compit_profile_{time.strftime('%Y%m%d_%H%M%S')}",
+        )
+        profile_path = f"{base_path}.prof"
+        summary_path = f"{base_path}.txt"
+        await self.hass.async_add_executor_job(
+            _write_results,
+            profile,
+            profile_path,
+            summary_path,
+            elapsed,
+            phases,
+            self._summary_lines,
+        )
+        _LOGGER.info("Compit profiling written to %s", profile_path)
+        return {
+            "profile": profile_path,
+            "summary": summary_path,
+            "seconds": round(elapsed, 3),
+            "phases": phases,
+        }
+
+
+def _write_results(
+    profile: cProfile.Profile,
+    profile_path: str,
+    summary_path: str,
+    elapsed: float,
+    phases: dict[str, dict[str, Any]],
+    summary_lines: int,
+) -> None:
+    """Write the raw profile and a top-N summary."""
+    profile.dump_stats(profile_path)
+
+    stream = io.StringIO()
+    stream.write(f"Profiled {elapsed:.3f} s\n\n")
+    stream.write("Time per phase (state_write is included in notify):\n")
+    for name, phase in sorted(phases.items()):
+        stream.write(
+            f"  {name:<12} {phase['seconds']:>10.6f} s in {phase['calls']} calls\n",
+        )
+    stream.write("\n")
+    pstats.Stats(profile, stream=stream).sort_stats(
+        pstats.SortKey.CUMULATIVE,
+    ).print_stats(summary_lines)
+
+    Path(summary_path).write_text(stream.getvalue(), encoding="utf-8")
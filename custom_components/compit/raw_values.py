@@ -0,0 +1,62 @@
+"""Bounded in-memory store for long raw Compit parameter values."""
+
+from __future__ import annotations
+
+import hashlib
+from collections import OrderedDict
+
+# Long raw values are kept out of the recorder; these limits bound how many
+# of them, and how many characters in total, are kept in memory instead.
+MAX_RAW_VALUES = 256
+MAX_RAW_CHARACTERS = 256 * 1000
+
+
+def raw_value_hash(value: str) -> str:
+    """Return the content hash used to reference a raw value."""
+    return hashlib.sha256(value.encode()).hexdigest()[:16]
+
+
+class RawValueStore:
+    """Least recently used store of raw values keyed by their content hash."""
+
+    def __init__(
+        self,
+        max_values: int = MAX_RAW_VALUES,
+        max_characters: int = MAX_RAW_CHARACTERS,
+    ) -> None:
+        """Initialize the store."""
+        self.max_values = max_values
+        self.max_characters = max_characters
+        self._values: OrderedDict[str, str] = OrderedDict()
+        self._characters = 0
+
+    def __contains__(self, value_hash: object) -> bool:
+        return value_hash in self._values
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self, value: str) -> str:
+        """Store a raw value and return its content hash."""
+        value_hash = raw_value_hash(value)
+        if value_hash in self._values:
+            self._values.move_to_end(value_hash)
+            return value_hash
+
+        self._values[value_hash] = value
+        self._characters += len(value)
+        while self._values and (
+            len(self._values) > self.max_values
+            or self._characters > self.max_characters
+        ):
+            _, evicted = self._values.popitem(last=False)
+            self._characters -= len(evicted)
+
+        return value_hash
+
+    def get(self, value_hash: str) -> str | None:
+        """Return the raw value stored under a content hash."""
+        value = self._values.get(value_hash)
+        if value is not None:
+            self._values.move_to_end(value_hash)
+        return value
@@ -6,17 +6,18 @@ from typing import TYPE_CHECKING
 
 from homeassistant.components.select import SelectEntity
 from homeassistant.helpers.device_registry import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN, MANUFACTURER_NAME
-from .coordinator import CompitConfigEntry, CompitDataUpdateCoordinator
+from .discovery import async_add_entities_in_batches, select_parameters
+from .entity import CompitEntity
 
 if TYPE_CHECKING:
     from compit_inext_api import Parameter
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 
-SELECT_PARAM_TYPE = "Select"
+    from .coordinator import CompitConfigEntry, CompitDataUpdateCoordinator
+
 PARALLEL_UPDATES = 0
 
 
@@ -28,27 +29,21 @@ async def async_setup_entry(
     """Set up Compit select sensors from a config entry."""
 
     coordinator = entry.runtime_data
-    select_entities = []
-    for device_id in coordinator.connector.all_devices:
-        device = coordinator.connector.get_device(device_id)
-        if device:
-            select_entities.extend(
-                [
-                    CompitSelect(
-                        coordinator,
-                        device_id,
-                        device.definition.name,
-                        parameter,
-                    )
-                    for parameter in device.definition.parameters or []
-                    if parameter.type == SELECT_PARAM_TYPE
-                ],
+    await async_add_entities_in_batches(
+        async_add_devices,
+        (
+            CompitSelect(
+                coordinator,
+                device_id,
+                device.definition.name,
+                parameter,
             )
-
-    async_add_devices(select_entities)
+            for device_id, device, parameter in select_parameters(coordinator)
+        ),
+    )
 
 
-class CompitSelect(CoordinatorEntity[CompitDataUpdateCoordinator], SelectEntity):
+class CompitSelect(CompitEntity, SelectEntity):
     """Representation of a Compit select entity."""
 
     def __init__(
@@ -82,13 +77,13 @@ class CompitSelect(CoordinatorEntity[CompitDataUpdateCoordinator], SelectEntity)
         """Return if entity is available."""
         return (
             super().available
-            and self.coordinator.connector.get_device(self.device_id) is not None
+            and self.coordinator.get_device(self.device_id) is not None
         )
 
     @property
     def current_option(self) -> str | None:
         """Return the current option."""
-        param = self.coordinator.connector.get_device_parameter(
+        param = self.coordinator.get_parameter(
             self.device_id,
             self.parameter.parameter_code,
         )
@@ -104,7 +99,7 @@ class CompitSelect(CoordinatorEntity[CompitDataUpdateCoordinator], SelectEntity)
         """Change the selected option."""
         state_value = self.available_values.get(option, -1)
 
-        await self.coordinator.connector.set_device_parameter(
+        await self.coordinator.async_set_parameter(
             self.device_id,
             self.parameter.parameter_code,
             state_value,
@@ -2,23 +2,51 @@
 
 from __future__ import annotations
 
+import time
 from typing import TYPE_CHECKING
 
 from homeassistant.components.sensor import SensorEntity
 from homeassistant.helpers.device_registry import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, MANUFACTURER_NAME
-from .coordinator import CompitConfigEntry, CompitDataUpdateCoordinator
+from .const import (
+    CONF_SENSOR_DEADBANDS,
+    CONF_SENSOR_MAX_SILENCE,
+    CONF_SENSOR_MIN_INTERVAL,
+    DEFAULT_SENSOR_MAX_SILENCE,
+    DEFAULT_SENSOR_MIN_INTERVAL,
+    DOMAIN,
+    MANUFACTURER_NAME,
+)
+from .discovery import async_add_entities_in_batches, sensor_parameters
+from .entity import CompitEntity
 
 if TYPE_CHECKING:
     from compit_inext_api import Parameter
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 
-SENSOR_PARAM_TYPE = "Sensor"
+    from .coordinator import CompitConfigEntry, CompitDataUpdateCoordinator
+
 PARALLEL_UPDATES = 0
 
+ATTR_RAW = "raw"
+ATTR_RAW_HASH = "raw_hash"
+
+# Smallest change of a numeric value that is written to the state machine,
+# keyed by the unit reported by the Compit parameter definition.
+UNIT_DEADBANDS: dict[str, float] = {
+    "°C": 0.2,
+    "°F": 0.5,
+    "K": 0.2,
+    "%": 1.0,
+    "ppm": 10.0,
+    "µg/m³": 1.0,
+    "Pa": 1.0,
+    "bar": 0.05,
+    "kW": 0.1,
+    "W": 5.0,
+}
+
 
 async def async_setup_entry(
     _hass: HomeAssistant,
@@ -28,49 +56,90 @@ async def async_setup_entry(
     """Set up Compit sensor entities from a config entry."""
 
     coordinator = entry.runtime_data
-    sensor_entities: list[CompitSensor] = []
+    await async_add_entities_in_batches(
+        async_add_entities,
+        (
+            CompitSensor(
+                coordinator,
+                device_id,
+                device.definition.name,
+                parameter,
+            )
+            for device_id, device, parameter in sensor_parameters(coordinator)
+        ),
+    )
 
-    for device_id in coordinator.connector.all_devices:
-        device = coordinator.connector.get_device(device_id)
-        if device is None:
-            continue
 
-        for parameter in device.definition.parameters or []:
-            if parameter is None:
-                continue
+DEADBAND_TOLERANCE = 1e-9
 
-            is_sensor = parameter.type == SENSOR_PARAM_TYPE
-            is_readonly = parameter.type == getattr(
-                parameter,
-                "ReadOnly",
-                False,
-            )
 
-            if not (is_sensor or is_readonly):
-                continue
+class SensorStateFilter:
+    """Decide whether a new sensor value is worth a state write.
 
-            device_param = next(
-                (p for p in device.state.params if p.code == parameter.parameter_code),
-                None,
-            )
-            if device_param is None or device_param.hidden:
-                continue
-
-            sensor_entities.append(
-                CompitSensor(
-                    coordinator,
-                    device_id,
-                    device.definition.name,
-                    parameter,
-                ),
-            )
+    Numeric values are written when they moved by at least the deadband and
+    the minimum interval has passed, or when the maximum silence interval has
+    passed since the last write. Non-numeric values are written on change.
+    """
+
+    def __init__(
+        self,
+        deadband: float,
+        min_interval: float,
+        max_silence: float,
+    ) -> None:
+        """Initialize the filter."""
+        self.deadband = deadband
+        self.min_interval = min_interval
+        self.max_silence = max_silence
+        self._last_value: object = None
+        self._last_write: float | None = None
+
+    def update(self, value: object, now: float, *, force: bool = False) -> bool:
+        """Return whether the value should be written and remember it if so."""
+        if not force and not self._passes(value, now):
+            return False
+
+        self._last_value = value
+        self._last_write = now
+        return True
 
-    async_add_entities(sensor_entities)
+    def _passes(self, value: object, now: float) -> bool:
+        """Check the value against the deadband and interval limits."""
+        if self._last_write is None or now - self._last_write >= self.max_silence:
+            return True
 
+        if value == self._last_value:
+            return False
 
-class CompitSensor(CoordinatorEntity[CompitDataUpdateCoordinator], SensorEntity):
+        number, last_number = _as_float(value), _as_float(self._last_value)
+        if number is None or last_number is None:
+            return True
+
+        if now - self._last_write < self.min_interval:
+            return False
+
+        # Tolerate float error, so a 0.2 step from 20.0 to 20.2 passes a 0.2
+        # deadband.
+        return abs(number - last_number) >= self.deadband - DEADBAND_TOLERANCE
+
+
+def _as_float(value: object) -> float | None:
+    """Return the value as a float, or None if it is not numeric."""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        return float(value)  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+        return None
+
+
+class CompitSensor(CompitEntity, SensorEntity):
     """Representation of a Compit sensor parameter."""
 
+    # Raw values can be up to 1000 characters long; only their hash is
+    # recorded, the values themselves are served from the coordinator.
+    _unrecorded_attributes = frozenset({ATTR_RAW})
+
     def __init__(
         self,
         coordinator: CompitDataUpdateCoordinator,
@@ -93,18 +162,57 @@ class CompitSensor(CoordinatorEntity[CompitDataUpdateCoordinator], SensorEntity)
             model=device_name,
         )
 
+        options = coordinator.config_entry.options
+        deadbands: dict[str, float] = options.get(CONF_SENSOR_DEADBANDS, {})
+        self._state_filter = SensorStateFilter(
+            deadband=deadbands.get(
+                parameter.parameter_code,
+                deadbands.get(parameter.unit, UNIT_DEADBANDS.get(parameter.unit, 0.0)),
+            ),
+            min_interval=options.get(
+                CONF_SENSOR_MIN_INTERVAL,
+                DEFAULT_SENSOR_MIN_INTERVAL,
+            ),
+            max_silence=options.get(
+                CONF_SENSOR_MAX_SILENCE,
+                DEFAULT_SENSOR_MAX_SILENCE,
+            ),
+        )
+        self._raw_value: str | None = None
+        self._raw_hash: str | None = None
+
+    def _should_write(self, *, available: bool, force: bool) -> bool:
+        """Write the state only if the new value passes the state filter.
+
+        Periodic full syncs do not bypass the filter; its maximum silence
+        interval already writes unchanged values regularly. The filter sees
+        the parameter value rather than the native value, which is None for
+        long values shown as attributes.
+        """
+        if not (force or available):
+            return False
+        param = self.coordinator.get_parameter(
+            self.device_id,
+            self.parameter.parameter_code,
+        )
+        return self._state_filter.update(
+            param.value if available and param is not None else None,
+            time.monotonic(),
+            force=force,
+        )
+
     @property
     def available(self) -> bool:
         """Return if entity is available."""
         return (
             super().available
-            and self.coordinator.connector.get_device(self.device_id) is not None
+            and self.coordinator.get_device(self.device_id) is not None
         )
 
     @property
     def native_value(self) -> str | int | float | bool | None:
         """Return the current value."""
-        param = self.coordinator.connector.get_device_parameter(
+        param = self.coordinator.get_parameter(
             self.device_id,
             self.parameter.parameter_code,
         )
@@ -117,12 +225,25 @@ class CompitSensor(CoordinatorEntity[CompitDataUpdateCoordinator], SensorEntity)
     @property
     def extra_state_attributes(self) -> dict[str, object] | None:
         """Return extra state attributes."""
-        param = self.coordinator.connector.get_device_parameter(
+        param = self.coordinator.get_parameter(
             self.device_id,
             self.parameter.parameter_code,
         )
 
+        attributes = super().extra_state_attributes
         if param is None or len(str(param.value)) > 1000 or len(str(param.value)) <= 20:
-            return None
-
-        return {"raw": param.value}
+            return attributes
+
+        raw_value = str(param.value)
+        if (
+            raw_value != self._raw_value
+            or self._raw_hash not in self.coordinator.raw_values
+        ):
+            self._raw_value = raw_value
+            self._raw_hash = self.coordinator.raw_values.add(raw_value)
+
+        return {
+            **(attributes or {}),
+            ATTR_RAW: param.value,
+            ATTR_RAW_HASH: self._raw_hash,
+        }
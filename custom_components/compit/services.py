@@ -0,0 +1,121 @@
+"""Services for the Compit integration."""
+
+from __future__ import annotations
+
+import time
+
+import voluptuous as vol
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+
+from .const import DOMAIN
+from .history import async_get_entity_history
+from .profiling import (
+    DATA_PROFILER,
+    DEFAULT_PROFILING_DURATION,
+    DEFAULT_SUMMARY_LINES,
+    MAX_PROFILING_DURATION,
+    MAX_SUMMARY_LINES,
+)
+
+ATTR_DURATION = "duration"
+ATTR_ENTITY_ID = "entity_id"
+ATTR_HASH = "hash"
+ATTR_HOURS = "hours"
+ATTR_SUMMARY_LINES = "summary_lines"
+
+SERVICE_GET_HISTORY = "get_history"
+SERVICE_GET_RAW_VALUE = "get_raw_value"
+SERVICE_START_PROFILING = "start_profiling"
+SERVICE_STOP_PROFILING = "stop_profiling"
+
+GET_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_ENTITY_ID): cv.entity_id,
+        vol.Optional(ATTR_HOURS): vol.All(vol.Coerce(float), vol.Range(min=0)),
+    },
+)
+GET_RAW_VALUE_SCHEMA = vol.Schema({vol.Required(ATTR_HASH): cv.string})
+START_PROFILING_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DURATION, default=DEFAULT_PROFILING_DURATION): vol.All(
+            vol.Coerce(float),
+            vol.Range(min=1, max=MAX_PROFILING_DURATION),
+        ),
+        vol.Optional(ATTR_SUMMARY_LINES, default=DEFAULT_SUMMARY_LINES): vol.All(
+            vol.Coerce(int),
+            vol.Range(min=1, max=MAX_SUMMARY_LINES),
+        ),
+    },
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Compit services."""
+
+    async def async_get_raw_value(call: ServiceCall) -> ServiceResponse:
+        """Return a raw sensor value by the hash recorded in its state."""
+        value_hash = call.data[ATTR_HASH]
+        for entry in hass.config_entries.async_loaded_entries(DOMAIN):
+            if (value := entry.runtime_data.raw_values.get(value_hash)) is not None:
+                return {"raw": value}
+
+        raise ServiceValidationError(f"No raw value stored for hash {value_hash}")
+
+    async def async_start_profiling(call: ServiceCall) -> None:
+        """Start a bounded profiling session."""
+        hass.data[DATA_PROFILER].async_start(
+            call.data[ATTR_DURATION],
+            call.data[ATTR_SUMMARY_LINES],
+        )
+
+    async def async_stop_profiling(_call: ServiceCall) -> ServiceResponse:
+        """Stop the profiling session and write the results."""
+        return await hass.data[DATA_PROFILER].async_stop()
+
+    async def async_get_history(call: ServiceCall) -> ServiceResponse:
+        """Return the in-memory short-term history of a Compit entity."""
+        entity_id = call.data[ATTR_ENTITY_ID]
+        history = async_get_entity_history(hass, entity_id)
+        if history is None:
+            raise ServiceValidationError(f"No history for {entity_id}")
+
+        since = 0.0
+        if (hours := call.data.get(ATTR_HOURS)) is not None:
+            since = time.time() - hours * 3600
+        return {"samples": history.samples(since)}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_HISTORY,
+        async_get_history,
+        schema=GET_HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_RAW_VALUE,
+        async_get_raw_value,
+        schema=GET_RAW_VALUE_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_START_PROFILING,
+        async_start_profiling,
+        schema=START_PROFILING_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_STOP_PROFILING,
+        async_stop_profiling,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
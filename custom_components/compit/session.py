@@ -0,0 +1,214 @@
+"""Dedicated HTTP session for the Compit cloud API."""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector, TraceConfig
+from aiohttp.hdrs import USER_AGENT
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+from .tracing import record_span
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from types import SimpleNamespace
+
+    from aiohttp import (
+        TraceConnectionCreateEndParams,
+        TraceConnectionReuseconnParams,
+        TraceRequestEndParams,
+        TraceRequestExceptionParams,
+        TraceRequestStartParams,
+        TraceResponseChunkReceivedParams,
+    )
+
+DATA_HTTP: HassKey[CompitHttp] = HassKey(f"{DOMAIN}_http")
+
+# Polls run every 30 s, so idle connections are kept open for longer than
+# that to be reused by the next poll instead of reconnecting with TLS.
+KEEPALIVE_TIMEOUT = 75
+DNS_CACHE_TTL = 300
+CONNECTIONS_PER_HOST = 4
+
+CONNECT_TIMEOUT = 10
+READ_TIMEOUT = 30
+# Upper bounds for a whole state poll and a whole parameter write, which
+# may each take several requests including a token refresh.
+POLL_TIMEOUT = 60
+WRITE_TIMEOUT = 20
+
+
+@dataclass
+class ResponseCounter:
+    """Response bytes received by the requests of one block of code."""
+
+    response_bytes: int = 0
+
+
+_response_counter: ContextVar[ResponseCounter | None] = ContextVar(
+    f"{DOMAIN}_response_counter",
+    default=None,
+)
+
+
+@dataclass
+class HttpStats:
+    """Connection reuse and request timing of the Compit session.
+
+    The session is shared, so these are the totals of all config entries.
+    """
+
+    requests: int = 0
+    errors: int = 0
+    connections_created: int = 0
+    connections_reused: int = 0
+    response_bytes: int = 0
+    request_seconds: float = 0.0
+    max_request_seconds: float = 0.0
+
+
+@dataclass
+class CompitHttp:
+    """The session shared by all Compit config entries and its stats."""
+
+    session: ClientSession
+    stats: HttpStats = field(default_factory=HttpStats)
+
+
+@callback
+def async_get_compit_session(hass: HomeAssistant) -> ClientSession:
+    """Return the Compit session, creating it on first use."""
+    return _async_get_http(hass).session
+
+
+@callback
+def async_get_http_stats(hass: HomeAssistant) -> HttpStats:
+    """Return the request stats of the Compit session."""
+    return _async_get_http(hass).stats
+
+
+@callback
+def _async_get_http(hass: HomeAssistant) -> CompitHttp:
+    """Return the Compit session and stats, creating them on first use."""
+    if (http := hass.data.get(DATA_HTTP)) is not None:
+        return http
+
+    stats = HttpStats()
+    session = ClientSession(
+        connector=TCPConnector(
+            limit_per_host=CONNECTIONS_PER_HOST,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=DNS_CACHE_TTL,
+        ),
+        timeout=ClientTimeout(connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT),
+        # aiohttp offers the encodings it can decode, including brotli if
+        # it is installed.
+        headers={USER_AGENT: SERVER_SOFTWARE},
+        trace_configs=[_trace_config(stats)],
+    )
+    http = hass.data[DATA_HTTP] = CompitHttp(session, stats)
+
+    async def _async_close(_event: Event) -> None:
+        """Close the session when Home Assistant shuts down."""
+        await session.close()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close)
+    return http
+
+
+@contextmanager
+def count_response_bytes() -> Iterator[ResponseCounter]:
+    """Count the response bytes received by the requests of the block.
+
+    Requests of other config entries running at the same time are not
+    counted, as they run in other tasks.
+    """
+    counter = ResponseCounter()
+    token = _response_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _response_counter.reset(token)
+
+
+def _trace_config(stats: HttpStats) -> TraceConfig:
+    """Return a trace config that collects request stats."""
+    trace_config = TraceConfig()
+
+    async def on_request_start(
+        _session: ClientSession,
+        context: SimpleNamespace,
+        _params: TraceRequestStartParams,
+    ) -> None:
+        context.start = time.perf_counter()
+
+    async def on_request_end(
+        _session: ClientSession,
+        context: SimpleNamespace,
+        params: TraceRequestEndParams,
+    ) -> None:
+        record_span(
+            "http",
+            context.start,
+            method=params.method,
+            path=params.url.path,
+            status=params.response.status,
+        )
+        elapsed = time.perf_counter() - context.start
+        stats.requests += 1
+        stats.request_seconds += elapsed
+        stats.max_request_seconds = max(stats.max_request_seconds, elapsed)
+
+    async def on_request_exception(
+        _session: ClientSession,
+        context: SimpleNamespace,
+        params: TraceRequestExceptionParams,
+    ) -> None:
+        record_span(
+            "http",
+            context.start,
+            method=params.method,
+            path=params.url.path,
+            error=repr(params.exception),
+        )
+        stats.errors += 1
+
+    async def on_connection_create_end(
+        _session: ClientSession,
+        _context: SimpleNamespace,
+        _params: TraceConnectionCreateEndParams,
+    ) -> None:
+        stats.connections_created += 1
+
+    async def on_connection_reuseconn(
+        _session: ClientSession,
+        _context: SimpleNamespace,
+        _params: TraceConnectionReuseconnParams,
+    ) -> None:
+        stats.connections_reused += 1
+
+    async def on_response_chunk_received(
+        _session: ClientSession,
+        _context: SimpleNamespace,
+        params: TraceResponseChunkReceivedParams,
+    ) -> None:
+        stats.response_bytes += len(params.chunk)
+        if (counter := _response_counter.get()) is not None:
+            counter.response_bytes += len(params.chunk)
+
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_request_exception.append(on_request_exception)
+    trace_config.on_connection_create_end.append(on_connection_create_end)
+    trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+    trace_config.on_response_chunk_received.append(on_response_chunk_received)
+    return trace_config
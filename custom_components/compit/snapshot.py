@@ -0,0 +1,251 @@
+"""Persisted snapshot of the Compit devices and their last known values."""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from collections.abc import Mapping
+
+    from compit_inext_api import DeviceInstance
+
+_LOGGER: logging.Logger = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# The snapshot is written at most this often while refreshes keep coming in,
+# and on shutdown.
+SAVE_DELAY = 300
+# Older snapshots are not used, their values are too likely to be misleading.
+MAX_SNAPSHOT_AGE = 24 * 3600
+
+
+@dataclass(slots=True)
+class CachedDetail:
+    """Option of a select parameter, loaded from the snapshot."""
+
+    description: str
+    state: int
+
+
+@dataclass(slots=True)
+class CachedParameter:
+    """Parameter definition, loaded from the snapshot."""
+
+    parameter_code: str
+    type: str
+    unit: str | None
+    label: str
+    min_value: float | None
+    max_value: float | None
+    # Named like the attribute of the library's definitions.
+    ReadOnly: bool
+    details: list[CachedDetail] | None
+
+
+@dataclass(slots=True)
+class CachedDefinition:
+    """Device definition, loaded from the snapshot."""
+
+    name: str
+    device_class: int
+    parameters: list[CachedParameter]
+
+
+@dataclass(slots=True)
+class CachedParam:
+    """Last known state of a parameter, loaded from the snapshot."""
+
+    code: str
+    value: Any
+    hidden: bool
+
+
+@dataclass(slots=True)
+class CachedState:
+    """Last known state of a device, loaded from the snapshot."""
+
+    params: list[CachedParam] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class CachedDevice:
+    """Device with its last known state, loaded from the snapshot.
+
+    It has the attributes of the library's devices that the entities read.
+    """
+
+    definition: CachedDefinition
+    state: CachedState
+
+
+def _snapshot_store(hass: HomeAssistant, entry_id: str) -> Store[dict[str, Any]]:
+    """Return the store that persists the snapshot of a config entry."""
+    return Store(hass, STORAGE_VERSION, f"{DOMAIN}.{entry_id}.snapshot")
+
+
+async def async_remove_snapshot(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove the persisted snapshot of a removed config entry."""
+    await _snapshot_store(hass, entry_id).async_remove()
+
+
+def _load_device(data: dict[str, Any]) -> CachedDevice:
+    """Return a device from its persisted form."""
+    return CachedDevice(
+        CachedDefinition(
+            data["name"],
+            data["device_class"],
+            [
+                CachedParameter(
+                    code,
+                    param_type,
+                    unit,
+                    label,
+                    min_value,
+                    max_value,
+                    read_only,
+                    None
+                    if details is None
+                    else [CachedDetail(*detail) for detail in details],
+                )
+                for (
+                    code,
+                    param_type,
+                    unit,
+                    label,
+                    min_value,
+                    max_value,
+                    read_only,
+                    details,
+                ) in data["parameters"]
+            ],
+        ),
+        CachedState(
+            [
+                CachedParam(code, value, hidden)
+                for code, value, hidden in data["params"]
+            ],
+        ),
+    )
+
+
+def _dump_device(device: DeviceInstance) -> dict[str, Any]:
+    """Return the persisted form of a device."""
+    definition = device.definition
+    return {
+        "name": definition.name,
+        "device_class": definition.device_class,
+        "parameters": [
+            [
+                parameter.parameter_code,
+                parameter.type,
+                parameter.unit,
+                parameter.label,
+                parameter.min_value,
+                parameter.max_value,
+                bool(getattr(parameter, "ReadOnly", False)),
+                None
+                if parameter.details is None
+                else [
+                    [detail.description, detail.state] for detail in parameter.details
+                ],
+            ]
+            for parameter in definition.parameters or []
+            if parameter is not None
+        ],
+        "params": [
+            [param.code, param.value, param.hidden] for param in device.state.params
+        ],
+    }
+
+
+class CompitSnapshot:
+    """Persist the devices of a config entry and their last known values.
+
+    Devices are stored with the parts of their definition that entities are
+    created from, and their parameters compactly as lists, so the entities
+    can be set up from the snapshot when the cloud is unreachable at start.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the snapshot."""
+        self._store = _snapshot_store(hass, entry_id)
+        self._devices: Mapping[int, DeviceInstance] | None = None
+        self._next_save = 0.0
+        self.saved: float | None = None
+
+    @property
+    def age(self) -> float | None:
+        """Return the age in seconds of the loaded snapshot."""
+        if self.saved is None:
+            return None
+        return time.time() - self.saved
+
+    @property
+    def expired(self) -> bool:
+        """Return whether the loaded snapshot is too old to be shown."""
+        age = self.age
+        return age is None or age > MAX_SNAPSHOT_AGE
+
+    async def async_load(self) -> dict[int, CachedDevice] | None:
+        """Load the persisted devices, unless there are none or too old."""
+        if (data := await self._store.async_load()) is None:
+            return None
+
+        try:
+            self.saved = float(data["saved"])
+            devices = {
+                int(device_id): _load_device(device)
+                for device_id, device in data["devices"].items()
+            }
+        except (KeyError, TypeError, ValueError) as err:
+            _LOGGER.debug("Ignoring unreadable Compit snapshot: %s", err)
+            self.saved = None
+            return None
+
+        if self.expired:
+            _LOGGER.debug("Ignoring Compit snapshot from %.0f s ago", self.age)
+            return None
+
+        _LOGGER.debug(
+            "Loaded %d Compit devices saved %.0f s ago",
+            len(devices),
+            self.age,
+        )
+        return devices or None
+
+    @callback
+    def async_schedule_save(self, devices: Mapping[int, DeviceInstance]) -> None:
+        """Persist the devices of the latest refresh after a delay."""
+        self._devices = devices
+        now = time.monotonic()
+        if now < self._next_save:
+            # A save is pending and will pick up these devices.
+            return
+
+        self._next_save = now + SAVE_DELAY
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    async def async_shutdown(self) -> None:
+        """Persist the latest devices right away."""
+        if self._devices is not None:
+            await self._store.async_save(self._data_to_save())
+
+    @callback
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the data to persist."""
+        return {
+            "saved": time.time(),
+            "devices": {
+                str(device_id): _dump_device(device)
+                for device_id, device in (self._devices or {}).items()
+                if device.state is not None
+            },
+        }
@@ -6,17 +6,18 @@ from typing import TYPE_CHECKING
 
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.helpers.device_registry import DeviceInfo
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .const import DOMAIN, MANUFACTURER_NAME
-from .coordinator import CompitConfigEntry, CompitDataUpdateCoordinator
+from .discovery import async_add_entities_in_batches, switch_parameters
+from .entity import CompitEntity
 
 if TYPE_CHECKING:
     from compit_inext_api import Parameter
     from homeassistant.core import HomeAssistant
     from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 
-BOOLEAN_PARAM_TYPE = "Boolean"
+    from .coordinator import CompitConfigEntry, CompitDataUpdateCoordinator
+
 PARALLEL_UPDATES = 0
 
 
@@ -28,41 +29,21 @@ async def async_setup_entry(
     """Set up Compit switch entities from a config entry."""
 
     coordinator = entry.runtime_data
-    switch_entities: list[CompitSwitch] = []
-
-    for device_id in coordinator.connector.all_devices:
-        device = coordinator.connector.get_device(device_id)
-        if device is None:
-            continue
-
-        for parameter in device.definition.parameters or []:
-            if parameter is None or parameter.type != BOOLEAN_PARAM_TYPE:
-                continue
-
-            if getattr(parameter, "ReadOnly", False):
-                # Boolean read-only values should be exposed as sensors (if needed).
-                continue
-
-            device_param = next(
-                (p for p in device.state.params if p.code == parameter.parameter_code),
-                None,
-            )
-            if device_param is None or device_param.hidden:
-                continue
-
-            switch_entities.append(
-                CompitSwitch(
-                    coordinator,
-                    device_id,
-                    device.definition.name,
-                    parameter,
-                ),
+    await async_add_entities_in_batches(
+        async_add_entities,
+        (
+            CompitSwitch(
+                coordinator,
+                device_id,
+                device.definition.name,
+                parameter,
             )
-
-    async_add_entities(switch_entities)
+            for device_id, device, parameter in switch_parameters(coordinator)
+        ),
+    )
 
 
-class CompitSwitch(CoordinatorEntity[CompitDataUpdateCoordinator], SwitchEntity):
+class CompitSwitch(CompitEntity, SwitchEntity):
     """Representation of a Compit boolean parameter."""
 
     def __init__(
@@ -91,13 +72,13 @@ class CompitSwitch(CoordinatorEntity[CompitDataUpdateCoordinator], SwitchEntity)
         """Return if entity is available."""
         return (
             super().available
-            and self.coordinator.connector.get_device(self.device_id) is not None
+            and self.coordinator.get_device(self.device_id) is not None
         )
 
     @property
     def is_on(self) -> bool | None:
         """Return if the switch is on."""
-        param = self.coordinator.connector.get_device_parameter(
+        param = self.coordinator.get_parameter(
             self.device_id,
             self.parameter.parameter_code,
         )
@@ -107,7 +88,7 @@ class CompitSwitch(CoordinatorEntity[CompitDataUpdateCoordinator], SwitchEntity)
 
     async def async_turn_on(self) -> None:
         """Turn the entity on."""
-        await self.coordinator.connector.set_device_parameter(
+        await self.coordinator.async_set_parameter(
             self.device_id,
             self.parameter.parameter_code,
             1,
@@ -115,7 +96,7 @@ class CompitSwitch(CoordinatorEntity[CompitDataUpdateCoordinator], SwitchEntity)
 
     async def async_turn_off(self) -> None:
         """Turn the entity off."""
-        await self.coordinator.connector.set_device_parameter(
+        await self.coordinator.async_set_parameter(
             self.device_id,
             self.parameter.parameter_code,
             0,
@@ -0,0 +1,224 @@
+"""Optional tracing of Compit refreshes and writes to a JSON lines file."""
+
+from __future__ import annotations
+
+import logging
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueListener, RotatingFileHandler
+from queue import SimpleQueue
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.json import json_dumps
+from homeassistant.util.hass_dict import HassKey
+
+from .const import CONF_TRACING, DOMAIN
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from homeassistant.config_entries import ConfigEntry
+
+DATA_TRACE_WRITER: HassKey[TraceWriter] = HassKey(f"{DOMAIN}_trace_writer")
+
+TRACE_FILE = "compit_traces.jsonl"
+MAX_TRACE_FILE_BYTES = 5 * 1024 * 1024
+TRACE_FILE_BACKUPS = 3
+
+_current_trace: ContextVar[Trace | None] = ContextVar(f"{DOMAIN}_trace", default=None)
+
+
+class Trace:
+    """Spans recorded during one refresh or write."""
+
+    def __init__(self, name: str, attributes: dict[str, Any]) -> None:
+        """Initialize the trace."""
+        self.name = name
+        self.attributes = attributes
+        self.trace_id = uuid.uuid4().hex
+        self.started = time.time()
+        self._start = time.perf_counter()
+        self._spans: list[dict[str, Any]] = []
+        self._totals: dict[str, list[float]] = {}
+
+    def add_span(
+        self,
+        name: str,
+        start: float,
+        end: float,
+        attributes: dict[str, Any] | None = None,
+    ) -> None:
+        """Add a span from performance counter start and end times."""
+        span = {
+            "name": name,
+            "offset": round(start - self._start, 6),
+            "duration": round(end - start, 6),
+        }
+        if attributes:
+            span.update(attributes)
+        self._spans.append(span)
+
+    def accumulate(self, name: str, seconds: float) -> None:
+        """Add to a span that sums up many short operations."""
+        total = self._totals.setdefault(name, [0.0, 0])
+        total[0] += seconds
+        total[1] += 1
+
+    def as_dict(self, error: str | None) -> dict[str, Any]:
+        """Return the finished trace."""
+        spans = self._spans + [
+            {"name": name, "duration": round(seconds, 6), "count": int(count)}
+            for name, (seconds, count) in self._totals.items()
+        ]
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "time": self.started,
+            "duration": round(time.perf_counter() - self._start, 6),
+            "error": error,
+            **self.attributes,
+            "spans": spans,
+        }
+
+
+class TraceWriter:
+    """Append finished traces to a rotating file from a background thread."""
+
+    def __init__(self, path: str) -> None:
+        """Initialize the writer and start its thread."""
+        self._handler = RotatingFileHandler(
+            path,
+            maxBytes=MAX_TRACE_FILE_BYTES,
+            backupCount=TRACE_FILE_BACKUPS,
+            encoding="utf-8",
+            delay=True,
+        )
+        self._queue: SimpleQueue[logging.LogRecord] = SimpleQueue()
+        self._listener = QueueListener(self._queue, self._handler)
+        self._listener.start()
+        # Entries that trace, the thread is stopped when none are left.
+        self.entry_ids: set[str] = set()
+        self.remove_close_listener: CALLBACK_TYPE | None = None
+
+    def write(self, trace: dict[str, Any]) -> None:
+        """Queue a trace for writing."""
+        self._queue.put_nowait(logging.makeLogRecord({"msg": json_dumps(trace)}))
+
+    def close(self) -> None:
+        """Write the queued traces and close the file."""
+        self._listener.stop()
+        self._handler.close()
+
+
+class CompitTracer:
+    """Create traces for one config entry, if tracing is enabled."""
+
+    def __init__(self, writer: TraceWriter | None, entry_id: str) -> None:
+        """Initialize the tracer."""
+        self._writer = writer
+        self._entry_id = entry_id
+
+    @contextmanager
+    def trace(self, name: str, **attributes: Any) -> Iterator[None]:
+        """Record the spans of the block as one trace.
+
+        Inside another trace, the spans are added to that trace instead.
+        """
+        if self._writer is None or _current_trace.get() is not None:
+            yield
+            return
+
+        trace = Trace(name, {"entry_id": self._entry_id, **attributes})
+        token = _current_trace.set(trace)
+        error: str | None = None
+        try:
+            yield
+        except BaseException as err:
+            error = repr(err)
+            raise
+        finally:
+            _current_trace.reset(token)
+            self._writer.write(trace.as_dict(error))
+
+
+@callback
+def async_get_tracer(hass: HomeAssistant, entry: ConfigEntry) -> CompitTracer:
+    """Return a tracer for a config entry."""
+    if not entry.options.get(CONF_TRACING):
+        return CompitTracer(None, entry.entry_id)
+
+    if (writer := hass.data.get(DATA_TRACE_WRITER)) is None:
+        writer = hass.data[DATA_TRACE_WRITER] = TraceWriter(
+            hass.config.path(TRACE_FILE),
+        )
+
+        async def _async_close(_event: Event) -> None:
+            """Flush the traces when Home Assistant shuts down."""
+            writer.remove_close_listener = None
+            await _async_close_writer(hass, writer)
+
+        writer.remove_close_listener = hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_CLOSE,
+            _async_close,
+        )
+
+    writer.entry_ids.add(entry.entry_id)
+
+    async def _async_release() -> None:
+        """Stop the writer when the last tracing entry is unloaded."""
+        writer.entry_ids.discard(entry.entry_id)
+        if not writer.entry_ids:
+            await _async_close_writer(hass, writer)
+
+    entry.async_on_unload(_async_release)
+    return CompitTracer(writer, entry.entry_id)
+
+
+async def _async_close_writer(hass: HomeAssistant, writer: TraceWriter) -> None:
+    """Stop the writer thread, after writing the queued traces."""
+    if hass.data.get(DATA_TRACE_WRITER) is not writer:
+        return
+
+    del hass.data[DATA_TRACE_WRITER]
+    if writer.remove_close_listener is not None:
+        writer.remove_close_listener()
+        writer.remove_close_listener = None
+    await hass.async_add_executor_job(writer.close)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[None]:
+    """Record the block as a span of the current trace, if any."""
+    if (trace := _current_trace.get()) is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add_span(name, start, time.perf_counter(), attributes)
+
+
+def record_span(name: str, start: float, **attributes: Any) -> None:
+    """Record a span that started at a performance counter time and ends now."""
+    if (trace := _current_trace.get()) is not None:
+        trace.add_span(name, start, time.perf_counter(), attributes)
+
+
+@contextmanager
+def accumulated_span(name: str) -> Iterator[None]:
+    """Add the time of the block to a summed span of the current trace."""
+    if (trace := _current_trace.get()) is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.accumulate(name, time.perf_counter() - start)
@@ -0,0 +1,44 @@
+"""Websocket API for the Compit integration."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+
+from .history import async_get_entity_history
+
+
+@callback
+def async_setup_websocket_api(hass: HomeAssistant) -> None:
+    """Register the Compit websocket commands."""
+    websocket_api.async_register_command(hass, websocket_history)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "compit/history",
+        vol.Required("entity_id"): cv.entity_id,
+        vol.Optional("since", default=0): vol.Coerce(float),
+    },
+)
+@callback
+def websocket_history(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg: dict[str, Any],
+) -> None:
+    """Return the in-memory short-term history of a Compit entity."""
+    history = async_get_entity_history(hass, msg["entity_id"])
+    if history is None:
+        connection.send_error(
+            msg["id"],
+            websocket_api.ERR_NOT_FOUND,
+            f"No history for {msg['entity_id']}",
+        )
+        return
+
+    connection.send_result(msg["id"], {"samples": history.samples(msg["since"])})
@@ -0,0 +1,218 @@
+"""Fixtures for the Compit integration tests."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
+
+import pytest
+from homeassistant.const import CONF_EMAIL, CONF_PASSWORD
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.compit.const import (
+    BOOLEAN_PARAM_TYPE,
+    DOMAIN,
+    NUMERIC_PARAM_TYPE,
+    SELECT_PARAM_TYPE,
+    SENSOR_PARAM_TYPE,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+    from homeassistant.core import HomeAssistant
+
+# Parameters of every fake device: code, type and unit.
+PARAMETERS = [
+    ("temperature_outside", SENSOR_PARAM_TYPE, "°C"),
+    ("temperature_boiler", SENSOR_PARAM_TYPE, "°C"),
+    ("humidity", SENSOR_PARAM_TYPE, "%"),
+    ("status_text", SENSOR_PARAM_TYPE, None),
+    ("target_temperature", NUMERIC_PARAM_TYPE, "°C"),
+    ("mode", SELECT_PARAM_TYPE, None),
+    ("pump", BOOLEAN_PARAM_TYPE, None),
+]
+
+
+@dataclass
+class FakeDetail:
+    """Option of a select parameter definition."""
+
+    description: str
+    state: int
+
+
+@dataclass
+class FakeParameter:
+    """Parameter definition, as provided by compit_inext_api."""
+
+    parameter_code: str
+    type: str
+    unit: str | None
+    label: str = ""
+    min_value: float | None = None
+    max_value: float | None = None
+    details: list[FakeDetail] = field(default_factory=list)
+
+
+@dataclass
+class FakeDefinition:
+    """Device definition, as provided by compit_inext_api."""
+
+    name: str
+    device_class: int
+    parameters: list[FakeParameter]
+
+
+@dataclass
+class FakeParam:
+    """Parameter state, as provided by compit_inext_api."""
+
+    code: str
+    value: Any
+    hidden: bool = False
+
+
+@dataclass
+class FakeState:
+    """Device state, as provided by compit_inext_api."""
+
+    params: list[FakeParam]
+
+
+@dataclass
+class FakeDevice:
+    """Device instance, as provided by compit_inext_api."""
+
+    definition: FakeDefinition
+    state: FakeState | None = None
+
+
+class FakeConnector:
+    """Stand-in for CompitApiConnector that serves changing values."""
+
+    devices_per_entry = 2
+    # Raised by logins, to simulate an unreachable cloud.
+    login_error: Exception | None = None
+
+    def __init__(self, _session: object) -> None:
+        """Initialize the connector."""
+        self.refreshes = 0
+        self.write_result: object = True
+        self.write_error: Exception | None = None
+        # Whether refreshes report successful writes right away.
+        self.report_writes = True
+        self.devices: dict[int, FakeDevice] = {}
+        # Values written successfully, reported by the following refreshes.
+        self.written: dict[tuple[int, str], Any] = {}
+
+    async def init(self, email: str, _password: str, _lang: str | None) -> bool:
+        """Log in and load the devices of the account with their state."""
+        CONNECTORS.append(self)
+        if self.login_error is not None:
+            raise self.login_error
+        # Accounts are named user<index>@..., their devices keep their ids
+        # across reloads.
+        first_id = int(email.removeprefix("user").partition("@")[0]) * 100 + 1
+        for device_id in range(first_id, first_id + self.devices_per_entry):
+            self.devices[device_id] = FakeDevice(
+                FakeDefinition(
+                    f"Device {device_id}",
+                    device_class=1,
+                    parameters=[
+                        FakeParameter(
+                            code,
+                            param_type,
+                            unit,
+                            label=code,
+                            details=[FakeDetail("Auto", 0), FakeDetail("Manual", 1)],
+                        )
+                        for code, param_type, unit in PARAMETERS
+                    ],
+                ),
+            )
+        await self.update_state()
+        return True
+
+    @property
+    def all_devices(self) -> dict[int, FakeDevice]:
+        return self.devices
+
+    def get_device(self, device_id: int) -> FakeDevice | None:
+        return self.devices.get(device_id)
+
+    async def update_state(self, device_id: int | None = None) -> None:
+        """Replace the state of the devices with fresh objects."""
+        self.refreshes += 1
+        tick = self.refreshes
+        for current_id, device in self.devices.items():
+            if device_id is not None and current_id != device_id:
+                continue
+            written = {
+                code: value
+                for (written_id, code), value in self.written.items()
+                if written_id == current_id
+            }
+            device.state = FakeState(
+                [
+                    # Drifts in 0.1 steps, with a missing reading now and then.
+                    FakeParam(
+                        "temperature_outside",
+                        None if tick % 13 == 0 else 5 + (tick % 20) / 10,
+                    ),
+                    FakeParam("temperature_boiler", 60.0),
+                    FakeParam("humidity", 40 + tick % 3),
+                    # Long raw values that never repeat.
+                    FakeParam("status_text", f"{'x' * 40} {tick}"),
+                    FakeParam(
+                        "target_temperature",
+                        written.get("target_temperature", 21.0),
+                    ),
+                    FakeParam("mode", written.get("mode", 0)),
+                    FakeParam("pump", written.get("pump", 1)),
+                ],
+            )
+
+    async def set_device_parameter(
+        self,
+        device_id: int,
+        parameter: str,
+        value: float,
+    ) -> object:
+        """Return the configured write result, or raise the configured error."""
+        if self.write_error is not None:
+            raise self.write_error
+        if self.write_result and self.report_writes:
+            self.written[device_id, parameter] = value
+        return self.write_result
+
+
+CONNECTORS: list[FakeConnector] = []
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations: None) -> None:  # noqa: ARG001
+    """Enable loading the integration from custom_components."""
+    return
+
+
+@pytest.fixture
+def connectors() -> Iterator[list[FakeConnector]]:
+    """Patch the API connector and return the connectors created."""
+    CONNECTORS.clear()
+    with patch("custom_components.compit.CompitApiConnector", FakeConnector):
+        yield CONNECTORS
+    CONNECTORS.clear()
+
+
+def create_entry(hass: HomeAssistant, index: int, **options: Any) -> MockConfigEntry:
+    """Add a config entry for an account."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        unique_id=f"user{index}@example.com",
+        data={CONF_EMAIL: f"user{index}@example.com", CONF_PASSWORD: "secret"},
+        options=options,
+    )
+    entry.add_to_hass(hass)
+    return entry
@@ -0,0 +1,126 @@
+"""Tests for the Compit command queue."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from homeassistant.exceptions import HomeAssistantError
+from pytest_homeassistant_custom_component.common import async_fire_time_changed
+
+from custom_components.compit.command_queue import RETRY_BASE_DELAY
+
+from .conftest import FakeConnector, create_entry
+
+if TYPE_CHECKING:
+    from freezegun.api import FrozenDateTimeFactory
+    from homeassistant.core import HomeAssistant
+
+
+@pytest.mark.parametrize(
+    ("write_result", "write_error"),
+    [
+        (None, None),
+        (False, None),
+        (None, TimeoutError()),
+    ],
+)
+async def test_failed_write_stays_queued(
+    hass: HomeAssistant,
+    freezer: FrozenDateTimeFactory,
+    connectors: list[FakeConnector],
+    write_result: object,
+    write_error: Exception | None,
+) -> None:
+    """Test that a failed write is neither applied nor dropped."""
+    entry = create_entry(hass, 0)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = entry.runtime_data
+    connector = connectors[0]
+    device_id = next(iter(connector.all_devices))
+    connector.write_result = write_result
+    connector.write_error = write_error
+
+    await coordinator.async_set_parameter(device_id, "target_temperature", 25)
+
+    assert coordinator.commands.depth == 1
+    param = coordinator.get_parameter(device_id, "target_temperature")
+    assert param is not None
+    assert param.value == 21.0
+
+    # A refresh does not cut the backoff short.
+    connector.write_result = True
+    connector.write_error = None
+    await coordinator.async_refresh()
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert not connector.written
+
+    # The retry delivers the command and the next refresh confirms it.
+    freezer.tick(RETRY_BASE_DELAY)
+    async_fire_time_changed(hass)
+    await hass.async_block_till_done()
+    assert connector.written
+    await coordinator.async_refresh()
+    assert coordinator.commands.depth == 0
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_rejected_write_is_dropped(
+    hass: HomeAssistant,
+    connectors: list[FakeConnector],
+) -> None:
+    """Test that a write the cloud rejects raises and is not retried."""
+    entry = create_entry(hass, 0)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = entry.runtime_data
+    connector = connectors[0]
+    device_id = next(iter(connector.all_devices))
+    connector.write_error = ValueError("HTTP 400")
+
+    with pytest.raises(HomeAssistantError):
+        await coordinator.async_set_parameter(device_id, "target_temperature", 99)
+
+    assert coordinator.commands.depth == 0
+    param = coordinator.get_parameter(device_id, "target_temperature")
+    assert param is not None
+    assert param.value == 21.0
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_unconfirmed_write_is_shown(
+    hass: HomeAssistant,
+    connectors: list[FakeConnector],
+) -> None:
+    """Test that refreshes reporting the old value do not undo a write."""
+    entry = create_entry(hass, 0)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = entry.runtime_data
+    connector = connectors[0]
+    device_id = next(iter(connector.all_devices))
+    key = (device_id, "target_temperature")
+
+    # The cloud keeps reporting the old value for a while.
+    connector.report_writes = False
+    await coordinator.async_set_parameter(device_id, "target_temperature", 25)
+    await coordinator.async_refresh()
+
+    assert coordinator.commands.pending_value(*key) == 25
+    param = coordinator.get_parameter(*key)
+    assert param is not None
+    assert param.value == 25
+
+    connector.written[key] = 25
+    await coordinator.async_refresh()
+
+    assert coordinator.commands.depth == 0
+    param = coordinator.get_parameter(*key)
+    assert param is not None
+    assert param.value == 25
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,38 @@
+"""Tests for the Compit short-term history."""
+
+from custom_components.compit.history import HistoryBuffer
+
+
+def test_missing_reading_keeps_history() -> None:
+    """Test that a missing or non-numeric reading does not erase the history."""
+    history = HistoryBuffer(size=4)
+    history.record({(1, "temp"): 20.0}, 100)
+    history.record({(1, "temp"): None}, 130)
+    history.record({(1, "temp"): "error"}, 160)
+    history.record({(1, "temp"): 21.0}, 190)
+
+    buffer = history.get(1, "temp")
+    assert buffer is not None
+    assert buffer.samples() == [(100, 20.0), (190, 21.0)]
+
+
+def test_removed_parameter_is_dropped() -> None:
+    """Test that parameters that are no longer reported are dropped."""
+    history = HistoryBuffer(size=4)
+    history.record({(1, "temp"): 20.0, (2, "temp"): 30.0}, 100)
+    history.record({(1, "temp"): 20.5}, 130)
+
+    assert len(history) == 1
+    assert history.get(2, "temp") is None
+
+
+def test_buffer_size_is_bounded() -> None:
+    """Test that a buffer keeps only the newest samples."""
+    history = HistoryBuffer(size=4)
+    for timestamp in range(10):
+        history.record({(1, "temp"): float(timestamp)}, timestamp)
+
+    buffer = history.get(1, "temp")
+    assert buffer is not None
+    assert [sample[0] for sample in buffer.samples()] == [6, 7, 8, 9]
+    assert buffer.samples(since=8) == [(8, 8.0), (9, 9.0)]
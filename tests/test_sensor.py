@@ -0,0 +1,71 @@
+"""Tests for the Compit sensor state filter."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from homeassistant.const import Platform
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.compit.const import DOMAIN
+from custom_components.compit.sensor import ATTR_RAW_HASH, SensorStateFilter
+
+from .conftest import FakeConnector, create_entry
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+
+def test_deadband_step_passes() -> None:
+    """Test that a step of exactly the deadband is written despite float error."""
+    state_filter = SensorStateFilter(deadband=0.2, min_interval=0, max_silence=900)
+
+    assert state_filter.update(20.0, 0)
+    assert not state_filter.update(20.1, 10)
+    assert state_filter.update(20.2, 20)
+
+
+def test_max_silence_writes_unchanged_value() -> None:
+    """Test that an unchanged value is written after the maximum silence."""
+    state_filter = SensorStateFilter(deadband=0.2, min_interval=0, max_silence=900)
+
+    assert state_filter.update(20.0, 0)
+    assert not state_filter.update(20.0, 899)
+    assert state_filter.update(20.0, 900)
+
+
+def test_min_interval_delays_numeric_changes() -> None:
+    """Test that numeric changes wait for the minimum interval."""
+    state_filter = SensorStateFilter(deadband=0.2, min_interval=60, max_silence=900)
+
+    assert state_filter.update(20.0, 0)
+    assert not state_filter.update(21.0, 30)
+    assert state_filter.update(21.0, 60)
+
+
+async def test_long_raw_value_is_written_on_change(
+    hass: HomeAssistant,
+    connectors: list[FakeConnector],
+) -> None:
+    """Test that a sensor showing a long raw value writes every new value."""
+    entry = create_entry(hass, 0)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    device_id = next(iter(connectors[0].all_devices))
+    entity_id = er.async_get(hass).async_get_entity_id(
+        Platform.SENSOR,
+        DOMAIN,
+        f"{device_id}_status_text",
+    )
+    assert entity_id is not None
+
+    hashes = set()
+    for _ in range(3):
+        await entry.runtime_data.async_refresh()
+        await hass.async_block_till_done()
+        state = hass.states.get(entity_id)
+        assert state is not None
+        hashes.add(state.attributes[ATTR_RAW_HASH])
+    assert len(hashes) == 3
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
@@ -0,0 +1,85 @@
+"""Tests for starting from the Compit snapshot while the cloud is down."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import pytest
+from compit_inext_api import CannotConnect
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import Platform
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.compit.const import DOMAIN
+from custom_components.compit.entity import ATTR_STALE
+
+from .conftest import FakeConnector, create_entry
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+
+
+async def test_setup_from_snapshot(
+    hass: HomeAssistant,
+    connectors: list[FakeConnector],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that entities start from the snapshot until a login succeeds."""
+    entry = create_entry(hass, 0)
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    device_id = next(iter(connectors[0].all_devices))
+    entity_id = er.async_get(hass).async_get_entity_id(
+        Platform.SENSOR,
+        DOMAIN,
+        f"{device_id}_temperature_boiler",
+    )
+    assert entity_id is not None
+    # Unloading saves the snapshot.
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+    monkeypatch.setattr(FakeConnector, "login_error", CannotConnect())
+    assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = entry.runtime_data
+
+    assert coordinator.stale
+    state = hass.states.get(entity_id)
+    assert state is not None
+    assert state.state == "60.0"
+    assert state.attributes[ATTR_STALE] is True
+    with pytest.raises(HomeAssistantError):
+        await coordinator.async_set_parameter(device_id, "target_temperature", 25)
+
+    # Failed logins keep the restored values.
+    await coordinator.async_refresh()
+    assert coordinator.last_update_success
+    assert coordinator.stale
+
+    monkeypatch.setattr(FakeConnector, "login_error", None)
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert coordinator.logged_in
+    assert not coordinator.stale
+    state = hass.states.get(entity_id)
+    assert state is not None
+    assert ATTR_STALE not in state.attributes
+    assert entry.state is ConfigEntryState.LOADED
+
+    assert await hass.config_entries.async_unload(entry.entry_id)
+
+
+async def test_no_snapshot_retries_setup(
+    hass: HomeAssistant,
+    connectors: list[FakeConnector],
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Test that setup is retried if the cloud is down and nothing was saved."""
+    monkeypatch.setattr(FakeConnector, "login_error", CannotConnect())
+    entry = create_entry(hass, 0)
+
+    assert not await hass.config_entries.async_setup(entry.entry_id)
+    assert entry.state is ConfigEntryState.SETUP_RETRY
+    assert connectors
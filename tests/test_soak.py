@@ -0,0 +1,181 @@
+"""Soak tests that fail on unbounded growth over many refreshes and reloads."""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+import sys
+from typing import TYPE_CHECKING
+
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+
+from custom_components.compit.const import CONF_TRACING, DOMAIN
+from custom_components.compit.raw_values import MAX_RAW_VALUES
+from custom_components.compit.tracing import DATA_TRACE_WRITER
+
+from .conftest import FakeConnector, create_entry
+
+if TYPE_CHECKING:
+    from homeassistant.core import HomeAssistant
+    from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+ENTRIES = 3
+# Refreshes before the bounded structures are expected to be full.
+WARMUP_REFRESHES = 300
+REFRESHES = 2000
+RELOADS = 100
+# Refreshes between writes of a setpoint.
+WRITE_EVERY = 50
+# Longest time in seconds one refresh may block the event loop.
+MAX_LOOP_STALL = 0.1
+# Allocated memory blocks the process may gain after the warm-up, per
+# refresh of an entry; a leak of one object per refresh exceeds it.
+MAX_BLOCKS_PER_REFRESH = 0.5
+# The same per reload of an entry, which also runs Home Assistant's own
+# setup code; a leaked coordinator or entity exceeds it many times over.
+MAX_BLOCKS_PER_RELOAD = 50
+
+
+async def _async_setup_entries(
+    hass: HomeAssistant,
+    **options: object,
+) -> list[MockConfigEntry]:
+    """Set up the config entries of the soak."""
+    entries = [create_entry(hass, index, **options) for index in range(ENTRIES)]
+    for entry in entries:
+        assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    return entries
+
+
+async def _async_refresh_all(
+    hass: HomeAssistant,
+    entries: list[MockConfigEntry],
+    refreshes: int,
+) -> None:
+    """Refresh every entry and write a setpoint now and then."""
+    for refresh in range(refreshes):
+        for entry in entries:
+            coordinator = entry.runtime_data
+            if refresh % WRITE_EVERY == 0:
+                device_id = next(iter(coordinator.connector.all_devices))
+                await coordinator.async_set_parameter(
+                    device_id,
+                    "target_temperature",
+                    20 + refresh // WRITE_EVERY % 3,
+                )
+            await coordinator.async_refresh()
+            assert coordinator.last_update_success
+    await hass.async_block_till_done()
+
+
+def _allocated_blocks() -> int:
+    """Return the memory blocks allocated after collecting garbage."""
+    gc.collect()
+    return sys.getallocatedblocks()
+
+
+def _footprint(hass: HomeAssistant, entries: list[MockConfigEntry]) -> dict[str, int]:
+    """Return the sizes that must not grow with the number of refreshes."""
+    coordinators = [entry.runtime_data for entry in entries]
+    return {
+        "history_buffers": sum(len(c.history) for c in coordinators),
+        "history_bytes": sum(c.history.memory_bytes for c in coordinators),
+        "raw_values": sum(len(c.raw_values) for c in coordinators),
+        "queued_commands": sum(c.commands.depth for c in coordinators),
+        "coordinator_listeners": sum(
+            len(list(c.async_contexts())) for c in coordinators
+        ),
+        "bus_listeners": sum(hass.bus.async_listeners().values()),
+        "states": len(hass.states.async_all()),
+        "devices": len(dr.async_get(hass).devices),
+        "entities": len(er.async_get(hass).entities),
+        "data_keys": len(hass.data),
+    }
+
+
+async def _async_unload_all(
+    hass: HomeAssistant,
+    entries: list[MockConfigEntry],
+) -> None:
+    """Unload the config entries of the soak."""
+    for entry in entries:
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
+
+
+async def test_refresh_soak(
+    hass: HomeAssistant,
+    connectors: list[FakeConnector],
+) -> None:
+    """Test that many refreshes and writes do not grow memory or listeners."""
+    entries = await _async_setup_entries(hass)
+    await _async_refresh_all(hass, entries, WARMUP_REFRESHES)
+    warm = _footprint(hass, entries)
+    warm_tasks = len(asyncio.all_tasks())
+    warm_blocks = _allocated_blocks()
+
+    await _async_refresh_all(hass, entries, REFRESHES)
+
+    assert _footprint(hass, entries) == warm
+    assert len(asyncio.all_tasks()) <= warm_tasks
+    assert (
+        _allocated_blocks() - warm_blocks
+        <= REFRESHES * ENTRIES * MAX_BLOCKS_PER_REFRESH
+    )
+    for entry in entries:
+        coordinator = entry.runtime_data
+        assert coordinator.max_loop_stall <= MAX_LOOP_STALL
+        # The long status text changes on every refresh, so this bound is
+        # reached during the warm-up.
+        assert len(coordinator.raw_values) <= MAX_RAW_VALUES
+        # Missing readings of the drifting temperature keep its history.
+        history = coordinator.history.get(
+            next(iter(coordinator.connector.all_devices)),
+            "temperature_outside",
+        )
+        assert history is not None
+        assert len(history) == history.size
+    assert all(connector.written for connector in connectors)
+
+    await _async_unload_all(hass, entries)
+
+
+async def test_reload_soak(
+    hass: HomeAssistant,
+    connectors: list[FakeConnector],
+) -> None:
+    """Test that many reloads do not leak listeners, tasks or writers."""
+    entries = await _async_setup_entries(hass, **{CONF_TRACING: True})
+    await _async_refresh_all(hass, entries, 1)
+    loaded = _footprint(hass, entries)
+    loaded_tasks = len(asyncio.all_tasks())
+    loaded_blocks = _allocated_blocks()
+
+    for _ in range(RELOADS):
+        for entry in entries:
+            assert await hass.config_entries.async_reload(entry.entry_id)
+        await hass.async_block_till_done()
+        await _async_refresh_all(hass, entries, 1)
+
+    assert _footprint(hass, entries) == loaded
+    assert len(asyncio.all_tasks()) <= loaded_tasks
+    assert (
+        _allocated_blocks() - loaded_blocks <= RELOADS * ENTRIES * MAX_BLOCKS_PER_RELOAD
+    )
+    for entry in entries:
+        assert entry.runtime_data.max_loop_stall <= MAX_LOOP_STALL
+    assert len(hass.config_entries.async_loaded_entries(DOMAIN)) == ENTRIES
+    assert len(connectors) == ENTRIES * (RELOADS + 1)
+
+    # The trace writer thread stops once no entry traces anymore.
+    assert DATA_TRACE_WRITER in hass.data
+    for entry in entries:
+        hass.config_entries.async_update_entry(entry, options={CONF_TRACING: False})
+    await hass.async_block_till_done()
+    assert all(entry.state is ConfigEntryState.LOADED for entry in entries)
+    assert DATA_TRACE_WRITER not in hass.data
+
+    await _async_unload_all(hass, entries)